@@ -1,18 +1,183 @@
+import gzip
+import itertools
+import os
+import pathlib
+import queue
+import shutil
 import sqlite3
-from typing import List, Tuple, Any, Optional
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Tuple, Any, Optional, Iterator, Dict, Callable
+
+
+# Distinguishes the in-memory databases of different replicas in one process
+_replica_ids = itertools.count()
+
+
+class _ReplicaConnection(sqlite3.Connection):
+    """Connection to one generation of an in-memory replica"""
+    generation = 0
+
+
+class _ReadReplica:
+    """
+    In-memory copy of a database file used to serve reads
+    
+    The copy lives in a shared-cache in-memory database that is kept alive
+    by an anchor connection. It is rebuilt, never modified in place: a new
+    generation is loaded with the online backup API and swapped in, so
+    readers of the old generation finish undisturbed.
+    """
+    
+    def __init__(self, db_path: str, max_bytes: int, check_interval: float, cached_statements: int):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.check_interval = check_interval
+        self.cached_statements = cached_statements
+        self.generation = 0
+        self.size = 0
+        self.fallback_reason: Optional[str] = None
+        self._id = next(_replica_ids)
+        # (uri, generation) of the copy being served, swapped in one assignment
+        self._current: Optional[Tuple[str, int]] = None
+        self._anchor: Optional[sqlite3.Connection] = None
+        self._source: Optional[sqlite3.Connection] = None
+        self._version: Optional[int] = None
+        self._stale = True
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self._pool: queue.LifoQueue = queue.LifoQueue()
+    
+    @property
+    def active(self) -> bool:
+        """Whether reads are currently being served from memory"""
+        return self._current is not None
+    
+    def invalidate(self) -> None:
+        """Mark the copy out of date; the next read rebuilds it."""
+        self._stale = True
+    
+    def acquire(self) -> Optional[sqlite3.Connection]:
+        """Return a connection to the current generation, or None to read from disk."""
+        if self._stale or time.monotonic() - self._checked >= self.check_interval:
+            self._refresh()
+        current = self._current
+        if current is None:
+            return None
+        uri, generation = current
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            if conn.generation == generation:
+                return conn
+            conn.close()
+        conn = sqlite3.connect(uri, uri=True, factory=_ReplicaConnection, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        if self._current is not current:
+            # Swapped while connecting; the old anchor may be gone, leaving an
+            # empty database behind this uri, so read from disk this once
+            conn.close()
+            return None
+        conn.row_factory = sqlite3.Row
+        conn.generation = generation
+        return conn
+    
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Return a connection from acquire(), closing it if its generation is gone."""
+        current = self._current
+        if current is not None and conn.generation == current[1]:
+            self._pool.put(conn)
+        else:
+            conn.close()
+    
+    def close(self) -> None:
+        """Drop the in-memory copy and every connection to it."""
+        with self._lock:
+            self._drop()
+            if self._source is not None:
+                self._source.close()
+                self._source = None
+    
+    def _refresh(self) -> None:
+        with self._lock:
+            if not self._stale and time.monotonic() - self._checked < self.check_interval:
+                return  # another thread just refreshed
+            # Cleared before copying so a write that lands mid-copy marks it stale again
+            stale, self._stale = self._stale, False
+            self._checked = time.monotonic()
+            if self._source is None:
+                self._source = sqlite3.connect(self.db_path, check_same_thread=False)
+            # data_version changes when any other connection, in any process, commits
+            version = self._source.execute("PRAGMA data_version").fetchone()[0]
+            if not stale and version == self._version:
+                return
+            self._version = version
+            page_size = self._source.execute("PRAGMA page_size").fetchone()[0]
+            size = page_size * self._source.execute("PRAGMA page_count").fetchone()[0]
+            if size > self.max_bytes:
+                self._drop()
+                self.fallback_reason = f"database is {size} bytes, over the {self.max_bytes} byte cap"
+                return
+            generation = self.generation + 1
+            uri = f"file:dal-replica-{self._id}-{generation}?mode=memory&cache=shared"
+            anchor = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            self._source.backup(anchor)
+            self._drop()
+            self._anchor, self.size, self.generation = anchor, size, generation
+            self._current = (uri, generation)
+            self.fallback_reason = None
+    
+    def _drop(self) -> None:
+        # Stop handing out the uri before its anchor closes. Connections still
+        # lent out keep their generation alive until released
+        self._current = None
+        if self._anchor is not None:
+            self._anchor.close()
+        self._anchor, self.size = None, 0
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
 
 
 class DAL:
     """Data Access Layer for SQLite database operations"""
     
-    def __init__(self, db_path: str = 'database.db'):
+    # Upper bound on cached SQL strings; callers with ad-hoc WHERE clauses
+    # should not be able to grow the cache without limit
+    SQL_CACHE_SIZE = 256
+    
+    def __init__(self, db_path: str = 'database.db', pool_size: int = 5, cached_statements: int = 128,
+                 read_replica: bool = False, replica_max_bytes: int = 64 * 2 ** 20,
+                 replica_check_interval: float = 1.0):
         """
         Initialize the Data Access Layer
         
         Args:
             db_path: Path to the SQLite database file
+            pool_size: Number of idle connections kept open for reuse (0 disables pooling)
+            cached_statements: Size of each connection's prepared statement cache
+            read_replica: Serve reads from an in-memory copy of the database
+            replica_max_bytes: Largest database copied into memory; bigger ones are read from disk
+            replica_check_interval: Seconds between checks for writes made outside this DAL
         """
         self.db_path = db_path
+        self.pool_size = pool_size
+        self.cached_statements = cached_statements
+        self._pool: queue.LifoQueue = queue.LifoQueue()
+        self._sql_cache: Dict[Tuple, str] = {}
+        self._schema: Dict[str, Tuple[Tuple[str, ...], Optional[str]]] = {}
+        self._replica = _ReadReplica(db_path, replica_max_bytes, replica_check_interval,
+                                     cached_statements) if read_replica else None
+        self._in_use = 0
+        self._in_use_lock = threading.Lock()
+        self.last_write_seconds: Optional[float] = None
+        self.last_write_at: Optional[float] = None
     
     def get_connection(self) -> sqlite3.Connection:
         """
@@ -21,29 +186,217 @@ class DAL:
         Returns:
             sqlite3.Connection: Database connection object
         """
-        conn = sqlite3.Connection(self.db_path)
+        # Pooled connections are handed between request threads, one at a time
+        conn = sqlite3.Connection(self.db_path, cached_statements=self.cached_statements,
+                                  check_same_thread=False)
         conn.row_factory = sqlite3.Row  # Enable column access by name
+        # Write-ahead logging lets readers, such as a slow client streaming
+        # /projects, hold a cursor open without blocking writers
+        conn.execute("PRAGMA journal_mode = WAL")
         return conn
     
-    def execute_query(self, query: str, params: Tuple = ()) -> List[sqlite3.Row]:
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a connection from the pool for the duration of a with block
+        
+        Reused connections keep their prepared statement cache warm. Any
+        transaction left open by the block is rolled back before the
+        connection goes back to the pool.
+        
+        Yields:
+            sqlite3.Connection: Database connection object
+        """
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self.get_connection()
+        with self._in_use_lock:
+            self._in_use += 1
+        try:
+            yield conn
+        finally:
+            with self._in_use_lock:
+                self._in_use -= 1
+            if conn.in_transaction:
+                conn.rollback()
+            if self._pool.qsize() < self.pool_size:
+                self._pool.put(conn)
+            else:
+                conn.close()
+    
+    @contextmanager
+    def read_connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a connection for reading
+        
+        With read_replica enabled this is a connection to the in-memory copy,
+        unless the database is over the memory cap; otherwise it is a pooled
+        disk connection.
+        
+        Yields:
+            sqlite3.Connection: Database connection object
+        """
+        conn = self._replica.acquire() if self._replica is not None else None
+        if conn is None:
+            with self.connection() as conn:
+                yield conn
+            return
+        try:
+            yield conn
+        finally:
+            self._replica.release(conn)
+    
+    def replica_status(self) -> Optional[Dict[str, Any]]:
+        """
+        Describe the read replica
+        
+        Returns:
+            Dictionary with active, generation, bytes and fallback_reason,
+            or None when read_replica is disabled
+        """
+        if self._replica is None:
+            return None
+        return {
+            'active': self._replica.active,
+            'generation': self._replica.generation,
+            'bytes': self._replica.size,
+            'fallback_reason': self._replica.fallback_reason,
+        }
+    
+    def pool_status(self) -> Dict[str, Any]:
+        """
+        Describe the connection pool
+        
+        Returns:
+            Dictionary with size, in_use, idle and saturation (in_use / size;
+            above 1 when busy threads have opened overflow connections)
+        """
+        in_use = self._in_use
+        return {
+            'size': self.pool_size,
+            'in_use': in_use,
+            'idle': self._pool.qsize(),
+            'saturation': in_use / self.pool_size if self.pool_size else None,
+        }
+    
+    def probe(self, timeout: float = 0.25) -> Dict[str, Any]:
+        """
+        Check that the database file can be read, giving up after timeout
+        
+        Uses its own read-only connection rather than the pool or the read
+        replica, so a saturated pool or a long write cannot hold it up past
+        the timeout.
+        
+        Args:
+            timeout: Seconds to wait for locks and for the query itself
+            
+        Returns:
+            Dictionary with ok, latency_ms, user_version (the schema
+            migration version) and error
+        """
+        started = time.perf_counter()
+        deadline = time.monotonic() + timeout
+        result: Dict[str, Any] = {'ok': False, 'latency_ms': None, 'user_version': None, 'error': None}
+        try:
+            conn = sqlite3.connect(pathlib.Path(self.db_path).resolve().as_uri() + '?mode=ro',
+                                   uri=True, timeout=timeout)
+            try:
+                # Interrupt the probe if it runs past the deadline
+                conn.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+                conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+                result['user_version'] = conn.execute("PRAGMA user_version").fetchone()[0]
+                result['ok'] = True
+            finally:
+                conn.close()
+        except sqlite3.Error as error:
+            result['error'] = str(error)
+        result['latency_ms'] = (time.perf_counter() - started) * 1000
+        return result
+    
+    def health(self, timeout: float = 0.25) -> Dict[str, Any]:
+        """
+        Gather readiness information for health checks
+        
+        Args:
+            timeout: Timeout for the database probe in seconds
+            
+        Returns:
+            Dictionary with probe, pool, last_write_ms, last_write_at,
+            sql_cache_entries, cached_tables and replica
+        """
+        return {
+            'probe': self.probe(timeout),
+            'pool': self.pool_status(),
+            'last_write_ms': None if self.last_write_seconds is None else self.last_write_seconds * 1000,
+            'last_write_at': self.last_write_at,
+            'sql_cache_entries': len(self._sql_cache),
+            'cached_tables': sorted(self._schema),
+            'replica': self.replica_status(),
+        }
+    
+    def close(self) -> None:
+        """Close every idle pooled connection and drop the read replica"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        if self._replica is not None:
+            self._replica.close()
+    
+    def execute_query(self, query: str, params: Tuple = (),
+                      row_factory: Optional[Callable[[sqlite3.Cursor, tuple], Any]] = None) -> List[sqlite3.Row]:
         """
         Execute a SELECT query and return results
         
         Args:
             query: SQL SELECT query string
             params: Query parameters tuple
+            row_factory: Optional factory to build each row instead of sqlite3.Row
             
         Returns:
             List of rows from the query result
         """
-        conn = self.get_connection()
-        try:
-            cursor = conn.cursor()
+        with self.read_connection() as conn:
+            cursor = self._cursor(conn, row_factory)
             cursor.execute(query, params)
-            results = cursor.fetchall()
-            return results
-        finally:
-            conn.close()
+            try:
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+    
+    def iter_query(self, query: str, params: Tuple = (), batch_size: int = 256,
+                   row_factory: Optional[Callable[[sqlite3.Cursor, tuple], Any]] = None) -> Iterator[sqlite3.Row]:
+        """
+        Execute a SELECT query and yield rows lazily
+        
+        The connection stays open until the iterator is exhausted or closed,
+        so only one batch of rows is held in memory at a time. Connections
+        use write-ahead logging, so writers are not blocked meanwhile; the
+        open read only holds back checkpoints of the WAL file.
+        
+        Args:
+            query: SQL SELECT query string
+            params: Query parameters tuple
+            batch_size: Number of rows fetched from the cursor per round trip
+            row_factory: Optional factory to build each row instead of sqlite3.Row
+            
+        Yields:
+            Rows from the query result
+        """
+        with self.read_connection() as conn:
+            cursor = self._cursor(conn, row_factory)
+            cursor.execute(query, params)
+            try:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                # Release the read lock before the connection is reused
+                cursor.close()
     
     def execute_non_query(self, query: str, params: Tuple = ()) -> int:
         """
@@ -56,14 +409,14 @@ class DAL:
         Returns:
             Number of affected rows
         """
-        conn = self.get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            conn.commit()
-            return cursor.rowcount
-        finally:
-            conn.close()
+        with self.connection() as conn:
+            started = time.perf_counter()
+            try:
+                cursor = conn.execute(query, params)
+                conn.commit()
+                return cursor.rowcount
+            finally:
+                self._wrote(started)
     
     def execute_scalar(self, query: str, params: Tuple = ()) -> Any:
         """
@@ -76,14 +429,13 @@ class DAL:
         Returns:
             Single value from the query result
         """
-        conn = self.get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            result = cursor.fetchone()
-            return result[0] if result else None
-        finally:
-            conn.close()
+        with self.read_connection() as conn:
+            cursor = conn.execute(query, params)
+            try:
+                result = cursor.fetchone()
+                return result[0] if result else None
+            finally:
+                cursor.close()
     
     def execute_many(self, query: str, params_list: List[Tuple]) -> int:
         """
@@ -96,14 +448,14 @@ class DAL:
         Returns:
             Total number of affected rows
         """
-        conn = self.get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.executemany(query, params_list)
-            conn.commit()
-            return cursor.rowcount
-        finally:
-            conn.close()
+        with self.connection() as conn:
+            started = time.perf_counter()
+            try:
+                cursor = conn.executemany(query, params_list)
+                conn.commit()
+                return cursor.rowcount
+            finally:
+                self._wrote(started)
     
     def create_table(self, table_name: str, schema: str) -> None:
         """
@@ -115,6 +467,7 @@ class DAL:
         """
         query = f"CREATE TABLE IF NOT EXISTS {table_name} ({schema})"
         self.execute_non_query(query)
+        self._forget_table(table_name)
     
     def drop_table(self, table_name: str) -> None:
         """
@@ -125,6 +478,7 @@ class DAL:
         """
         query = f"DROP TABLE IF EXISTS {table_name}"
         self.execute_non_query(query)
+        self._forget_table(table_name)
     
     def insert(self, table_name: str, data: dict) -> int:
         """
@@ -137,23 +491,30 @@ class DAL:
         Returns:
             ID of the inserted row
         """
-        columns = ', '.join(data.keys())
-        placeholders = ', '.join(['?' for _ in data])
-        query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
+        columns = tuple(data)
         
-        conn = self.get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute(query, tuple(data.values()))
-            conn.commit()
-            return cursor.lastrowid
-        finally:
-            conn.close()
+        def build() -> str:
+            self._check_columns(table_name, columns)
+            placeholders = ', '.join(['?' for _ in columns])
+            return f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})"
+        
+        query = self._sql(('insert', table_name, columns), build)
+        with self.connection() as conn:
+            started = time.perf_counter()
+            try:
+                cursor = conn.execute(query, tuple(data.values()))
+                conn.commit()
+                return cursor.lastrowid
+            finally:
+                self._wrote(started)
     
     def update(self, table_name: str, data: dict, where_clause: str, where_params: Tuple = ()) -> int:
         """
         Update rows in a table
         
+        Tables with a DateUpdated column have it set to the current time,
+        unless data sets it explicitly.
+        
         Args:
             table_name: Name of the table
             data: Dictionary of column names and new values
@@ -163,9 +524,17 @@ class DAL:
         Returns:
             Number of affected rows
         """
-        set_clause = ', '.join([f"{col} = ?" for col in data.keys()])
-        query = f"UPDATE {table_name} SET {set_clause} WHERE {where_clause}"
-        params = tuple(data.values()) + where_params
+        columns = tuple(data)
+        
+        def build() -> str:
+            self._check_columns(table_name, columns)
+            assignments = [f"{col} = ?" for col in columns]
+            if 'DateUpdated' not in columns and 'DateUpdated' in self.get_columns(table_name):
+                assignments.append("DateUpdated = CURRENT_TIMESTAMP")
+            return f"UPDATE {table_name} SET {', '.join(assignments)} WHERE {where_clause}"
+        
+        query = self._sql(('update', table_name, columns, where_clause), build)
+        params = tuple(data.values()) + tuple(where_params)
         return self.execute_non_query(query, params)
     
     def delete(self, table_name: str, where_clause: str, where_params: Tuple = ()) -> int:
@@ -180,7 +549,11 @@ class DAL:
         Returns:
             Number of affected rows
         """
-        query = f"DELETE FROM {table_name} WHERE {where_clause}"
+        def build() -> str:
+            self._check_columns(table_name, ())
+            return f"DELETE FROM {table_name} WHERE {where_clause}"
+        
+        query = self._sql(('delete', table_name, where_clause), build)
         return self.execute_non_query(query, where_params)
     
     def select_all(self, table_name: str, order_by: Optional[str] = None) -> List[sqlite3.Row]:
@@ -194,12 +567,17 @@ class DAL:
         Returns:
             List of all rows
         """
-        query = f"SELECT * FROM {table_name}"
-        if order_by:
-            query += f" ORDER BY {order_by}"
-        return self.execute_query(query)
+        def build() -> str:
+            self._check_columns(table_name, ())
+            query = f"SELECT * FROM {table_name}"
+            if order_by:
+                query += f" ORDER BY {order_by}"
+            return query
+        
+        return self.execute_query(self._sql(('select_all', table_name, order_by), build))
     
-    def select_by_id(self, table_name: str, id_value: int, id_column: str = 'id') -> Optional[sqlite3.Row]:
+    def select_by_id(self, table_name: str, id_value: int, id_column: str = 'id',
+                     columns: Optional[List[str]] = None) -> Optional[sqlite3.Row]:
         """
         Select a single row by ID
         
@@ -207,10 +585,480 @@ class DAL:
             table_name: Name of the table
             id_value: Value of the ID
             id_column: Name of the ID column (default: 'id')
+            columns: Optional list of columns to select instead of all
             
         Returns:
             Single row or None if not found
         """
-        query = f"SELECT * FROM {table_name} WHERE {id_column} = ?"
+        selected = tuple(columns) if columns else ()
+        
+        def build() -> str:
+            self._check_columns(table_name, selected + (id_column,))
+            column_list = ', '.join(selected) if selected else '*'
+            return f"SELECT {column_list} FROM {table_name} WHERE {id_column} = ?"
+        
+        query = self._sql(('select_by_id', table_name, id_column, selected), build)
         results = self.execute_query(query, (id_value,))
         return results[0] if results else None
+    
+    def select_json_page(self, table_name: str, columns: List[str], key_column: str,
+                         after: Optional[int] = None, limit: int = 50,
+                         where_clause: Optional[str] = None, where_params: Tuple = ()) -> List[Tuple[int, str]]:
+        """
+        Select one page of rows, ordered by key, already encoded as JSON objects
+        
+        SQLite builds each object with json_object(), so only the requested
+        columns are read and no Python-side dict is created per row.
+        
+        Args:
+            table_name: Name of the table
+            columns: Columns to include in each JSON object
+            key_column: Unique, ordered column used as the pagination cursor
+            after: Only return rows whose key is greater than this value
+            limit: Maximum number of rows to return
+            where_clause: Optional extra filter (without 'WHERE' keyword)
+            where_params: Parameters for the extra filter
+            
+        Returns:
+            List of (key, JSON object text) tuples
+        """
+        selected = tuple(columns)
+        
+        def build() -> str:
+            self._check_columns(table_name, selected + (key_column,))
+            pairs = ', '.join(f"'{col}', {col}" for col in selected)
+            conditions = []
+            if where_clause:
+                conditions.append(f"({where_clause})")
+            if after is not None:
+                conditions.append(f"{key_column} > ?")
+            query = f"SELECT {key_column}, json_object({pairs}) FROM {table_name}"
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            return query + f" ORDER BY {key_column} LIMIT ?"
+        
+        key = ('json_page', table_name, selected, key_column, where_clause, after is not None)
+        params = tuple(where_params) + ((after,) if after is not None else ()) + (limit,)
+        return [tuple(row) for row in self.execute_query(self._sql(key, build), params)]
+    
+    def get_columns(self, table_name: str) -> List[str]:
+        """
+        Get the column names of a table in schema order
+        
+        Args:
+            table_name: Name of the table
+            
+        Returns:
+            List of column names (empty if the table does not exist)
+        """
+        return list(self._table_info(table_name)[0])
+    
+    def get_primary_key(self, table_name: str) -> Optional[str]:
+        """
+        Get the primary key column of a table
+        
+        Args:
+            table_name: Name of the table
+            
+        Returns:
+            Name of the first primary key column, or None if there is none
+        """
+        return self._table_info(table_name)[1]
+    
+    def enable_change_log(self, table_name: str) -> str:
+        """
+        Record every insert, update and delete on a table in a change log
+        
+        Creates <table>_changes and triggers that append to it. Rows are
+        identified by the table's primary key. On tables with an IsActive
+        column, inactive rows are never published: inserting an inactive
+        row or deactivating one is logged as a delete, reactivating a row as
+        an insert, and edits to a row that stays inactive are not logged.
+        When the log is first created, every existing row is
+        logged once so a consumer starting from cursor 0 gets a full copy.
+        Safe to call repeatedly.
+        
+        Args:
+            table_name: Name of the table to track
+            
+        Returns:
+            Name of the change log table
+        """
+        self._check_columns(table_name, ())
+        key = self.get_primary_key(table_name)
+        if key is None:
+            raise ValueError(f"Table {table_name} has no primary key to log changes by")
+        log = f"{table_name}_changes"
+        insert_op, update_op, update_when, seed_op = "'insert'", "'update'", "", "'insert'"
+        if 'IsActive' in self.get_columns(table_name):
+            # Inactive rows are hidden, so they are only ever published as deletes
+            insert_op = "CASE WHEN NEW.IsActive = 0 THEN 'delete' ELSE 'insert' END"
+            update_op = ("CASE WHEN NEW.IsActive = 0 THEN 'delete' "
+                         "WHEN OLD.IsActive = 0 THEN 'insert' ELSE 'update' END")
+            # Edits to a row that stays inactive are not published at all
+            update_when = "WHEN NOT (OLD.IsActive = 0 AND NEW.IsActive = 0)"
+            seed_op = "CASE WHEN IsActive = 0 THEN 'delete' ELSE 'insert' END"
+        
+        with self.connection() as conn:
+            # Take the write lock before looking at the log, so workers starting
+            # together create and seed it once between them
+            conn.executescript(f"""
+                BEGIN IMMEDIATE;
+                CREATE TABLE IF NOT EXISTS {log} (
+                    ChangeID INTEGER PRIMARY KEY AUTOINCREMENT,
+                    RowID INTEGER NOT NULL,
+                    Operation TEXT NOT NULL,
+                    ChangedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                CREATE INDEX IF NOT EXISTS {log}_row ON {log} (RowID, ChangeID);
+                -- Recreated on every call so existing logs pick up trigger fixes
+                DROP TRIGGER IF EXISTS {log}_insert;
+                DROP TRIGGER IF EXISTS {log}_update;
+                DROP TRIGGER IF EXISTS {log}_delete;
+                CREATE TRIGGER {log}_insert AFTER INSERT ON {table_name} BEGIN
+                    INSERT INTO {log} (RowID, Operation) VALUES (NEW.{key}, {insert_op});
+                END;
+                CREATE TRIGGER {log}_update AFTER UPDATE ON {table_name} {update_when} BEGIN
+                    INSERT INTO {log} (RowID, Operation) VALUES (NEW.{key}, {update_op});
+                END;
+                CREATE TRIGGER {log}_delete AFTER DELETE ON {table_name} BEGIN
+                    INSERT INTO {log} (RowID, Operation) VALUES (OLD.{key}, 'delete');
+                END;
+                INSERT INTO {log} (RowID, Operation)
+                    SELECT {key}, {seed_op} FROM {table_name}
+                    WHERE NOT EXISTS (SELECT 1 FROM {log}) ORDER BY {key};
+                COMMIT;
+            """)
+        self._wrote()
+        self._forget_table(log)
+        return log
+    
+    def iter_changes(self, table_name: str, since: int = 0, limit: Optional[int] = None,
+                     columns: Optional[List[str]] = None) -> Iterator[Tuple[int, str, int, Optional[str]]]:
+        """
+        Yield logged changes to a table after a cursor, oldest first
+        
+        Each change carries the row's current values encoded as a JSON
+        object by SQLite, or None for deletes and rows that no longer exist
+        or are now inactive.
+        
+        Args:
+            table_name: Table whose change log was enabled with enable_change_log
+            since: Only return changes with a ChangeID greater than this cursor
+            limit: Maximum number of changes to return
+            columns: Columns to include in each JSON object (default: all)
+            
+        Yields:
+            (ChangeID, Operation, RowID, JSON object text or None) tuples
+        """
+        log = f"{table_name}_changes"
+        selected = tuple(columns) if columns else tuple(self.get_columns(table_name))
+        
+        def build() -> str:
+            self._check_columns(log, ())
+            self._check_columns(table_name, selected)
+            key = self.get_primary_key(table_name)
+            pairs = ', '.join(f"'{col}', t.{col}" for col in selected)
+            hidden = f"c.Operation = 'delete' OR t.{key} IS NULL"
+            if 'IsActive' in self.get_columns(table_name):
+                # An older entry for a row deactivated since must not expose its current values
+                hidden += " OR t.IsActive = 0"
+            return (f"SELECT c.ChangeID, c.Operation, c.RowID, "
+                    f"CASE WHEN {hidden} THEN NULL ELSE json_object({pairs}) END "
+                    f"FROM {log} c LEFT JOIN {table_name} t ON t.{key} = c.RowID "
+                    f"WHERE c.ChangeID > ? ORDER BY c.ChangeID LIMIT ?")
+        
+        query = self._sql(('changes', table_name, selected), build)
+        for row in self.iter_query(query, (since, -1 if limit is None else limit)):
+            yield tuple(row)
+    
+    def change_version(self, table_name: str) -> int:
+        """
+        Get the cursor of the latest logged change to a table
+        
+        The value only changes when the table does, which makes it a cheap
+        cache key for anything derived from the table.
+        
+        Args:
+            table_name: Table whose change log was enabled with enable_change_log
+            
+        Returns:
+            Highest ChangeID, or 0 if nothing has been logged
+        """
+        log = f"{table_name}_changes"
+        
+        def build() -> str:
+            self._check_columns(log, ('ChangeID',))
+            return f"SELECT COALESCE(MAX(ChangeID), 0) FROM {log}"
+        
+        return self.execute_scalar(self._sql(('change_version', log), build))
+    
+    def archive_rows(self, table_name: str, where_clause: str, where_params: Tuple = (),
+                     batch_size: int = 500) -> int:
+        """
+        Move matching rows into <table>_archive in batches
+        
+        Each batch is copied and deleted in its own transaction, so writers
+        are only held up for one batch at a time. The archive table is
+        created on first use, and columns added to the table later are added
+        to the archive too. Deletes are recorded by the change log if one is
+        enabled.
+        
+        Args:
+            table_name: Name of the table
+            where_clause: WHERE clause selecting rows to archive (without 'WHERE' keyword)
+            where_params: Parameters for the WHERE clause
+            batch_size: Rows moved per transaction
+            
+        Returns:
+            Number of rows archived
+        """
+        self._check_columns(table_name, ())
+        key = self.get_primary_key(table_name)
+        if key is None:
+            raise ValueError(f"Table {table_name} has no primary key to archive by")
+        archive = f"{table_name}_archive"
+        columns = self.get_columns(table_name)
+        column_list = ', '.join(columns)
+        
+        moved = 0
+        with self.connection() as conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {archive} AS SELECT * FROM {table_name} WHERE 0")
+            archived = {row['name'] for row in conn.execute("SELECT name FROM pragma_table_info(?)", (archive,))}
+            for column in columns:
+                if column not in archived:
+                    conn.execute(f"ALTER TABLE {archive} ADD COLUMN {column}")
+            conn.commit()
+            try:
+                while True:
+                    # Lock out writers before choosing the batch, so a row changed
+                    # after it was selected cannot be moved
+                    conn.execute("BEGIN IMMEDIATE")
+                    ids = [row[0] for row in conn.execute(
+                        f"SELECT {key} FROM {table_name} WHERE {where_clause} ORDER BY {key} LIMIT ?",
+                        tuple(where_params) + (batch_size,))]
+                    if not ids:
+                        conn.rollback()
+                        break
+                    placeholders = ', '.join('?' for _ in ids)
+                    conn.execute(f"INSERT INTO {archive} ({column_list}) SELECT {column_list} "
+                                 f"FROM {table_name} WHERE {key} IN ({placeholders})", ids)
+                    conn.execute(f"DELETE FROM {table_name} WHERE {key} IN ({placeholders})", ids)
+                    conn.commit()
+                    moved += len(ids)
+            finally:
+                self._wrote()
+                self._forget_table(archive)
+        return moved
+    
+    def incremental_vacuum(self, pages: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Return free pages to the filesystem with PRAGMA incremental_vacuum
+        
+        A database not yet in auto_vacuum = INCREMENTAL mode is converted
+        first, which needs one full VACUUM.
+        
+        Args:
+            pages: Maximum number of free pages to release (default: all)
+            
+        Returns:
+            Dictionary with converted, conversion_bytes (size change from the
+            conversion, which may be positive), pages_freed, bytes_reclaimed,
+            free_pages (left on the freelist), bytes_before (after any
+            conversion) and bytes_after
+        """
+        # VACUUM cannot run inside a transaction, so use an autocommit connection
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        try:
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            bytes_before = page_size * conn.execute("PRAGMA page_count").fetchone()[0]
+            converted = conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2
+            conversion_bytes = 0
+            if converted:
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+                # The conversion adds pointer-map pages, so it can grow the file;
+                # it is reported on its own so bytes_reclaimed is never negative
+                converted_size = page_size * conn.execute("PRAGMA page_count").fetchone()[0]
+                conversion_bytes = converted_size - bytes_before
+                bytes_before = converted_size
+            free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            # The pragma frees one page per step; executescript steps it to completion
+            conn.executescript(f"PRAGMA incremental_vacuum({int(pages) if pages else 0});")
+            # In WAL mode the file only shrinks once the log is checkpointed
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            free_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            bytes_after = page_size * conn.execute("PRAGMA page_count").fetchone()[0]
+        finally:
+            conn.close()
+            self._wrote()
+        return {
+            'converted': converted,
+            'conversion_bytes': conversion_bytes,
+            'pages_freed': free_before - free_after,
+            'bytes_reclaimed': bytes_before - bytes_after,
+            'free_pages': free_after,
+            'bytes_before': bytes_before,
+            'bytes_after': bytes_after,
+        }
+    
+    def backup(self, dest_path: str, pages: int = 256, sleep: float = 0.01,
+               compress: Optional[bool] = None, verify: bool = True) -> Dict[str, Any]:
+        """
+        Copy the live database to dest_path using SQLite's online backup API
+        
+        The copy is made a few pages at a time. The source is only locked
+        while a step runs, and the backup pauses between steps so readers
+        and writers on other connections are not held up. A write from
+        another connection during the copy makes SQLite restart it, so the
+        result is always a consistent snapshot.
+        
+        Args:
+            dest_path: Path of the backup file
+            pages: Pages copied per step
+            sleep: Seconds to pause between steps
+            compress: Gzip the snapshot (default: when dest_path ends in .gz)
+            verify: Run an integrity check on the finished snapshot
+            
+        Returns:
+            Dictionary with pages, bytes, steps, seconds, throughput (bytes/s),
+            dest_path, compressed_bytes (when compressed) and integrity
+        """
+        if compress is None:
+            compress = dest_path.endswith('.gz')
+        steps = 0
+        
+        def pause(status: int, remaining: int, total: int) -> None:
+            nonlocal steps
+            steps += 1
+            if remaining and sleep:
+                time.sleep(sleep)
+        
+        copy_path = dest_path
+        start = time.perf_counter()
+        try:
+            if compress:
+                fd, copy_path = tempfile.mkstemp(suffix='.db', dir=os.path.dirname(os.path.abspath(dest_path)))
+                os.close(fd)
+            source = self.get_connection()
+            target = sqlite3.connect(copy_path)
+            try:
+                source.backup(target, pages=pages, progress=pause)
+                # Keep the snapshot a single self-contained file
+                target.execute("PRAGMA journal_mode = DELETE")
+                page_size = target.execute("PRAGMA page_size").fetchone()[0]
+                page_count = target.execute("PRAGMA page_count").fetchone()[0]
+            finally:
+                target.close()
+                source.close()
+            if compress:
+                with open(copy_path, 'rb') as raw, gzip.open(dest_path, 'wb') as packed:
+                    shutil.copyfileobj(raw, packed)
+        finally:
+            if copy_path != dest_path:
+                os.unlink(copy_path)
+        seconds = time.perf_counter() - start
+        
+        stats: Dict[str, Any] = {
+            'dest_path': dest_path,
+            'pages': page_count,
+            'bytes': page_count * page_size,
+            'steps': steps,
+            'seconds': seconds,
+            'throughput': page_count * page_size / seconds if seconds else 0.0,
+        }
+        if compress:
+            stats['compressed_bytes'] = os.path.getsize(dest_path)
+        if verify:
+            stats['integrity'] = self.verify_backup(dest_path, compressed=compress)
+        return stats
+    
+    @staticmethod
+    def verify_backup(path: str, compressed: Optional[bool] = None) -> str:
+        """
+        Run PRAGMA integrity_check on a backup file
+        
+        Args:
+            path: Backup file
+            compressed: Whether the file is gzipped (default: detected from its first bytes)
+            
+        Returns:
+            'ok' if the snapshot is intact, otherwise the first complaint
+        """
+        check_path = path
+        try:
+            if compressed is None:
+                with open(path, 'rb') as f:
+                    compressed = f.read(2) == b'\x1f\x8b'
+            if compressed:
+                fd, check_path = tempfile.mkstemp(suffix='.db')
+                with os.fdopen(fd, 'wb') as raw, gzip.open(path, 'rb') as packed:
+                    shutil.copyfileobj(packed, raw)
+            conn = sqlite3.connect(pathlib.Path(check_path).resolve().as_uri() + '?mode=ro', uri=True)
+            try:
+                return conn.execute("PRAGMA integrity_check").fetchone()[0]
+            finally:
+                conn.close()
+        except (sqlite3.DatabaseError, OSError, EOFError) as error:
+            # OSError covers a missing file and gzip.BadGzipFile; EOFError a truncated gzip
+            return str(error)
+        finally:
+            if check_path != path:
+                os.unlink(check_path)
+    
+    def _table_info(self, table_name: str, refresh: bool = False) -> Tuple[Tuple[str, ...], Optional[str]]:
+        """Return (columns, primary key) for a table, read from the schema once and cached."""
+        info = self._schema.get(table_name)
+        if info is None or refresh:
+            rows = self.execute_query("SELECT name, pk FROM pragma_table_info(?)", (table_name,))
+            info = (tuple(row['name'] for row in rows), next((row['name'] for row in rows if row['pk'] == 1), None))
+            if not info[0]:
+                # Don't cache misses; the table may be created later
+                return info
+            self._schema[table_name] = info
+        return info
+    
+    def _check_columns(self, table_name: str, columns: Tuple[str, ...]) -> None:
+        """Raise ValueError unless the table and every column exist in the schema."""
+        known = self._table_info(table_name)[0]
+        if known and all(col in known for col in columns):
+            return
+        # The schema may have changed underneath us; look again before failing
+        known = self._table_info(table_name, refresh=True)[0]
+        if not known:
+            raise ValueError(f"Unknown table: {table_name}")
+        unknown = [col for col in columns if col not in known]
+        if unknown:
+            raise ValueError(f"Unknown column(s) for {table_name}: {', '.join(unknown)}")
+    
+    @staticmethod
+    def _cursor(conn: sqlite3.Connection, row_factory: Optional[Callable]) -> sqlite3.Cursor:
+        """Open a cursor, overriding the connection's row factory if one is given."""
+        cursor = conn.cursor()
+        if row_factory is not None:
+            cursor.row_factory = row_factory
+        return cursor
+    
+    def _wrote(self, started: Optional[float] = None) -> None:
+        """Note that the database may have changed through this DAL, and how long the write took."""
+        if started is not None:
+            self.last_write_seconds = time.perf_counter() - started
+            self.last_write_at = time.time()
+        if self._replica is not None:
+            self._replica.invalidate()
+    
+    def _forget_table(self, table_name: str) -> None:
+        """Drop cached schema and SQL for a table after DDL."""
+        self._schema.pop(table_name, None)
+        for key in [key for key in self._sql_cache if key[1] == table_name]:
+            del self._sql_cache[key]
+    
+    def _sql(self, key: Tuple, build: Callable[[], str]) -> str:
+        """Return the SQL cached under key, validating and building it on first use."""
+        query = self._sql_cache.get(key)
+        if query is None:
+            query = build()
+            if len(self._sql_cache) >= self.SQL_CACHE_SIZE:
+                self._sql_cache.clear()
+            self._sql_cache[key] = query
+        return query
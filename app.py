@@ -1,11 +1,43 @@
-from flask import Flask, render_template, request, redirect, url_for
+import glob
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+
+import click
+from flask import (Flask, render_template, stream_template, stream_with_context, request, redirect, url_for,
+                   jsonify, send_file)
 from DAL import DAL
+from models import Project
 
 # Serve static files directly from the project root so existing `static/` folder (with css/ and images/) works
 app = Flask(__name__, static_folder='.', static_url_path='')
 
-# Initialize Data Access Layer
-dal = DAL('projects.db')
+# Initialize Data Access Layer; the site is read-mostly, so reads are served
+# from an in-memory copy of the database that is rebuilt after writes
+dal = DAL('projects.db', read_replica=True)
+
+# Page sizes for the JSON API
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 500
+CHANGES_PAGE_SIZE = 1000
+CHANGES_MAX_PAGE_SIZE = 10000
+
+# Seconds /readyz waits on the database before reporting the worker as not ready
+READY_PROBE_TIMEOUT = 0.25
+
+# Schema version recorded in PRAGMA user_version by migrate-db; /readyz
+# reports a worker whose database is older as not ready
+SCHEMA_VERSION = 1
+
+# Canonical address used for absolute URLs in the sitemap and feed; never
+# taken from the request, whose Host header is chosen by the client
+app.config['SITE_URL'] = os.environ.get('SITE_URL', 'http://localhost:5000')
+
+# Newest projects listed in the Atom feed, and pages listed in the sitemap
+FEED_SIZE = 20
+SITEMAP_PAGES = ['index', 'about', 'resume', 'projects', 'contact']
 
 
 @app.route('/')
@@ -20,13 +52,198 @@ def about():
 
 @app.route('/projects')
 def projects():
-    # Get all active projects from the database
-    all_projects = dal.execute_query(
-        "SELECT * FROM projects WHERE IsActive = 1 ORDER BY DateCreated DESC"
+    # Stream active projects straight from the database cursor so the page
+    # header is sent before the rows are read and memory stays flat
+    all_projects = dal.iter_query(
+        "SELECT * FROM projects WHERE IsActive = 1 ORDER BY DateCreated DESC",
+        row_factory=Project.from_row
     )
-    # Convert sqlite3.Row objects to dictionaries for easier template access
-    projects_list = [dict(project) for project in all_projects]
-    return render_template('projects.html', projects=projects_list)
+    return stream_template('projects.html', projects=all_projects)
+
+
+def _change_version():
+    """Return the projects change log version, or None if the log has not been set up."""
+    try:
+        return dal.change_version('projects')
+    except ValueError:
+        return None
+
+
+def _api_fields():
+    """Return the requested ?fields= projection and any names not in the projects table."""
+    columns = dal.get_columns('projects')
+    requested = request.args.get('fields')
+    if not requested:
+        return columns, []
+    fields = [field.strip() for field in requested.split(',') if field.strip()]
+    return fields, [field for field in fields if field not in columns]
+
+
+def _json_response(body):
+    """Wrap a pre-encoded JSON body with cache headers and answer conditional requests."""
+    response = app.response_class(body, mimetype='application/json')
+    response.headers['Cache-Control'] = 'public, max-age=60'
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+@app.route('/api/projects')
+def api_projects():
+    fields, unknown = _api_fields()
+    if unknown:
+        return jsonify(error=f"Unknown field(s): {', '.join(unknown)}"), 400
+    key_column = dal.get_primary_key('projects')
+    limit = min(max(request.args.get('limit', API_PAGE_SIZE, type=int), 1), API_MAX_PAGE_SIZE)
+    cursor = request.args.get('cursor', type=int)
+
+    # Rows arrive already encoded by SQLite; only the envelope is built here
+    page = dal.select_json_page('projects', fields, key_column, after=cursor, limit=limit,
+                                where_clause='IsActive = 1')
+    next_cursor = page[-1][0] if len(page) == limit else None
+    body = '{"data":[' + ','.join(obj for _, obj in page) + '],"next_cursor":' + json.dumps(next_cursor) + '}'
+    return _json_response(body)
+
+
+@app.route('/api/projects/changes')
+def api_project_changes():
+    fields, unknown = _api_fields()
+    if unknown:
+        return jsonify(error=f"Unknown field(s): {', '.join(unknown)}"), 400
+    if _change_version() is None:
+        return jsonify(error='Change log not enabled; run flask --app app migrate-db'), 503
+    since = request.args.get('since', 0, type=int)
+    limit = min(max(request.args.get('limit', CHANGES_PAGE_SIZE, type=int), 1), CHANGES_MAX_PAGE_SIZE)
+    changes = dal.iter_changes('projects', since, limit, fields)
+
+    # One JSON object per line; a consumer resumes from the last cursor it saw
+    def generate():
+        for cursor, operation, row_id, project in changes:
+            yield f'{{"cursor":{cursor},"op":"{operation}","id":{row_id},"project":{project or "null"}}}\n'
+
+    return app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@app.route('/api/projects/<int:project_id>')
+def api_project(project_id):
+    fields, unknown = _api_fields()
+    if unknown:
+        return jsonify(error=f"Unknown field(s): {', '.join(unknown)}"), 400
+    columns = fields if 'IsActive' in fields else fields + ['IsActive']
+    project = dal.select_by_id('projects', project_id, dal.get_primary_key('projects'), columns)
+    if project is None or not project['IsActive']:
+        return jsonify(error='Project not found'), 404
+    return _json_response(json.dumps({field: project[field] for field in fields}))
+
+
+@app.route('/healthz')
+def healthz():
+    # Liveness only: answering at all means the process is up
+    response = jsonify(status='ok')
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@app.route('/readyz')
+def readyz():
+    health = dal.health(READY_PROBE_TIMEOUT)
+    migrated = (health['probe']['user_version'] or 0) >= SCHEMA_VERSION
+    ready = health['probe']['ok'] and migrated
+    if ready:
+        status = 'ready'
+    else:
+        status = 'unmigrated' if health['probe']['ok'] else 'unavailable'
+    response = jsonify(status=status, schema_version=SCHEMA_VERSION, migrated=migrated, **health)
+    response.status_code = 200 if ready else 503
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@app.template_filter('atom_date')
+def atom_date(timestamp):
+    """Format an SQLite CURRENT_TIMESTAMP value (UTC) as an RFC 3339 date."""
+    return timestamp.replace(' ', 'T') + 'Z' if timestamp else ''
+
+
+@app.template_global()
+def site_url(endpoint, **values):
+    """Build an absolute URL for an endpoint on the canonical SITE_URL."""
+    return app.config['SITE_URL'].rstrip('/') + url_for(endpoint, **values)
+
+
+def _cached_xml(name, render):
+    """
+    Serve an XML document generated from the projects table, cached on disk
+
+    The cache file is keyed by the projects change log version, so it is
+    only regenerated after the table changes; until then each request is a
+    conditional file send.
+    """
+    version = _change_version()
+    if version is None:
+        # Nothing to key a cache on until the change log is set up
+        return app.response_class(render(), mimetype='application/xml')
+    # Documents contain absolute URLs, so a new SITE_URL needs new copies
+    site = hashlib.sha1(app.config['SITE_URL'].encode()).hexdigest()[:8]
+    cache_dir = app.config.get('FEED_CACHE_DIR') or os.path.join(app.instance_path, 'feeds')
+    path = os.path.join(cache_dir, f'{name}-{version}-{site}.xml')
+
+    def send():
+        return send_file(path, mimetype='application/xml', conditional=True,
+                         etag=f'{name}-{version}-{site}', max_age=300)
+
+    try:
+        return send()
+    except FileNotFoundError:
+        pass  # not generated yet, or removed by a request that saw a newer version
+    body = render()
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+    # Only remove older versions; a concurrent request may be serving a newer one
+    for stale in glob.glob(os.path.join(cache_dir, f'{name}-*.xml')):
+        stale_version = os.path.basename(stale)[len(name) + 1:].split('-')[0]
+        if stale_version.isdigit() and int(stale_version) < version:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass  # another worker got there first
+    try:
+        return send()
+    except FileNotFoundError:
+        return app.response_class(body, mimetype='application/xml')
+
+
+def _latest_projects():
+    return dal.execute_query(
+        "SELECT * FROM projects WHERE IsActive = 1 ORDER BY DateCreated DESC LIMIT ?",
+        (FEED_SIZE,), row_factory=Project.from_row
+    )
+
+
+def _newest_update(projects):
+    stamps = [project.DateUpdated or project.DateCreated for project in projects]
+    stamps = [stamp for stamp in stamps if stamp]
+    return atom_date(max(stamps)) if stamps else None
+
+
+@app.route('/sitemap.xml')
+def sitemap():
+    def render():
+        return render_template('sitemap.xml', pages=SITEMAP_PAGES, updated=_newest_update(_latest_projects()))
+    return _cached_xml('sitemap', render)
+
+
+@app.route('/projects/feed.xml')
+def project_feed():
+    def render():
+        projects = _latest_projects()
+        updated = _newest_update(projects) or datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        return render_template('feed.xml', projects=projects, updated=updated)
+    response = _cached_xml('feed', render)
+    response.mimetype = 'application/atom+xml'
+    return response
 
 
 @app.route('/resume')
@@ -86,5 +303,77 @@ def thanks():
     return render_template('thanks.html')
 
 
+def migrate():
+    """Bring the database up to SCHEMA_VERSION and return the new user_version."""
+    dal.enable_change_log('projects')
+    version = dal.execute_scalar("PRAGMA user_version")
+    if version < SCHEMA_VERSION:
+        # PRAGMA arguments cannot be bound; SCHEMA_VERSION is a constant
+        dal.execute_non_query(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        version = SCHEMA_VERSION
+    return version
+
+
+@app.cli.command('migrate-db')
+def migrate_db():
+    """Set up the projects change log used by the change feed, sitemap and Atom feed.
+
+    Safe to run on every deploy; existing projects are logged once.
+    """
+    version = migrate()
+    click.echo(f"Schema version {version}; change log at version {dal.change_version('projects')}")
+
+
+@app.cli.command('backup-db')
+@click.argument('destination')
+@click.option('--pages', default=256, show_default=True, help='Pages copied per step.')
+@click.option('--sleep', default=0.01, show_default=True, help='Seconds to pause between steps.')
+@click.option('--compress/--no-compress', default=None, help='Gzip the snapshot (default: if DESTINATION ends in .gz).')
+@click.option('--verify/--no-verify', default=True, show_default=True, help='Integrity-check the snapshot.')
+def backup_db(destination, pages, sleep, compress, verify):
+    """Back up the projects database to DESTINATION without blocking the site."""
+    stats = dal.backup(destination, pages=pages, sleep=sleep, compress=compress, verify=verify)
+    mib = stats['bytes'] / 2 ** 20
+    click.echo(f"Copied {stats['pages']} pages ({mib:.2f} MiB) in {stats['steps']} steps, "
+               f"{stats['seconds']:.2f}s ({stats['throughput'] / 2 ** 20:.2f} MiB/s) to {destination}")
+    if 'compressed_bytes' in stats:
+        click.echo(f"Compressed to {stats['compressed_bytes'] / 2 ** 20:.2f} MiB")
+    if verify:
+        if stats['integrity'] != 'ok':
+            raise click.ClickException(f"Integrity check failed: {stats['integrity']}")
+        click.echo('Integrity check: ok')
+
+
+@app.cli.command('archive-projects')
+@click.option('--older-than-days', type=int, default=None,
+              help='Only archive inactive projects not updated for this many days.')
+@click.option('--batch-size', default=500, show_default=True, help='Rows moved per transaction.')
+@click.option('--vacuum/--no-vacuum', default=True, show_default=True,
+              help='Run an incremental vacuum afterwards.')
+@click.option('--vacuum-pages', type=int, default=None, help='Free at most this many pages (default: all).')
+def archive_projects(older_than_days, batch_size, vacuum, vacuum_pages):
+    """Move inactive projects to projects_archive and reclaim free space.
+
+    Meant to be run on a schedule, e.g. nightly from cron:
+    flask --app app archive-projects --older-than-days 30
+    """
+    where_clause = 'IsActive = 0'
+    where_params = ()
+    if older_than_days is not None:
+        stamp = 'DateUpdated' if 'DateUpdated' in dal.get_columns('projects') else 'DateCreated'
+        where_clause += f" AND {stamp} < datetime('now', ?)"
+        where_params = (f'-{older_than_days} days',)
+    moved = dal.archive_rows('projects', where_clause, where_params, batch_size)
+    click.echo(f"Archived {moved} project(s)")
+    if vacuum:
+        stats = dal.incremental_vacuum(vacuum_pages)
+        if stats['converted']:
+            click.echo(f"Switched the database to incremental auto-vacuum "
+                       f"({stats['conversion_bytes'] / 1024:+.1f} KiB)")
+        click.echo(f"Reclaimed {stats['bytes_reclaimed'] / 1024:.1f} KiB ({stats['pages_freed']} pages), "
+                   f"{stats['free_pages']} free page(s) left, file now {stats['bytes_after'] / 1024:.1f} KiB")
+
+
 if __name__ == '__main__':
+    migrate()
     app.run(port=5000, debug=True)
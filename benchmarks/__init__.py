@@ -0,0 +1,3 @@
+"""
+Benchmarks for the personal website (not collected by pytest)
+"""
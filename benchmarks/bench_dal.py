@@ -0,0 +1,78 @@
+"""
+Microbenchmark per-call overhead of the DAL helper methods
+
+Runs each helper against a fresh-connection DAL (pool_size=0), a pooled
+DAL and a pooled DAL with the in-memory read replica, so the effect of warm
+statement caches and memory-resident reads is visible. Run from the
+repository root:
+
+    python -m benchmarks.bench_dal --calls 2000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from DAL import DAL
+from benchmarks.harness import seed_projects
+
+
+def time_calls(func, calls: int) -> float:
+    """Return the mean time per call in microseconds."""
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def bench(dal: DAL, calls: int) -> dict:
+    """Time every helper on one DAL instance."""
+    row = {
+        'Title': 'Bench',
+        'Description': 'Microbenchmark row',
+        'ImageFileName': 'bench.jpg',
+        'TechnologiesUsed': 'Python',
+        'IsActive': 1,
+    }
+    ids = []
+    results = {
+        'insert': time_calls(lambda i: ids.append(dal.insert('projects', row)), calls),
+        'update': time_calls(
+            lambda i: dal.update('projects', {'Description': f'Updated {i}'}, 'ProjectID = ?', (ids[i],)), calls),
+        'select_by_id': time_calls(lambda i: dal.select_by_id('projects', ids[i], 'ProjectID'), calls),
+        'select_all': time_calls(lambda i: dal.select_all('projects'), max(calls // 100, 1)),
+        'delete': time_calls(lambda i: dal.delete('projects', 'ProjectID = ?', (ids[i],)), calls),
+    }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=2000, help='Calls per helper')
+    parser.add_argument('--rows', type=int, default=100, help='Rows seeded before timing')
+    args = parser.parse_args()
+
+    results = {}
+    configs = (
+        ('fresh', {'pool_size': 0}),
+        ('pooled', {'pool_size': 5}),
+        ('replica', {'pool_size': 5, 'read_replica': True}),
+    )
+    for label, options in configs:
+        db_fd, db_path = tempfile.mkstemp()
+        try:
+            dal = DAL(db_path, **options)
+            seed_projects(dal, args.rows)
+            results[label] = bench(dal, args.calls)
+            dal.close()
+        finally:
+            os.close(db_fd)
+            os.unlink(db_path)
+
+    print(f"{'helper':<14}" + ''.join(f"{label + ' (us)':>14}" for label, _ in configs))
+    for helper in results['fresh']:
+        print(f"{helper:<14}" + ''.join(f"{results[label][helper]:14.1f}" for label, _ in configs))
+
+
+if __name__ == '__main__':
+    main()
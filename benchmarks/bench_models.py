@@ -0,0 +1,79 @@
+"""
+Compare dict rows with Project rows: memory per row and render time
+
+Run from the repository root:
+
+    python -m benchmarks.bench_models --rows 10000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from jinja2 import Environment
+
+from DAL import DAL
+from benchmarks.harness import seed_projects
+from models import Project
+
+# The per-row part of projects.html that differs between the two row types
+DICT_ROW = Environment().from_string(
+    "{% for p in rows %}<td>{{ p.Title }}</td><td>{{ p.Description }}</td>"
+    "{% for tech in p.TechnologiesUsed.split(',') %}<span>{{ tech.strip() }}</span>{% endfor %}{% endfor %}"
+)
+PROJECT_ROW = Environment().from_string(
+    "{% for p in rows %}<td>{{ p.Title }}</td><td>{{ p.Description }}</td>"
+    "{% for tech in p.tags %}<span>{{ tech }}</span>{% endfor %}{% endfor %}"
+)
+
+QUERY = "SELECT * FROM projects WHERE IsActive = 1"
+
+
+def load(dal: DAL, as_projects: bool):
+    """Fetch every active row as dicts or as Project objects."""
+    if as_projects:
+        return dal.execute_query(QUERY, row_factory=Project.from_row)
+    return [dict(row) for row in dal.execute_query(QUERY)]
+
+
+def measure(dal: DAL, as_projects: bool, template, renders: int) -> dict:
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = load(dal, as_projects)
+    load_ms = (time.perf_counter() - start) * 1000
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Each render gets freshly loaded rows, as a request would
+    render_ms = 0.0
+    for _ in range(renders):
+        rows = load(dal, as_projects)
+        start = time.perf_counter()
+        template.render(rows=rows)
+        render_ms += (time.perf_counter() - start) / renders * 1000
+    return {'rows': len(rows), 'load_ms': load_ms, 'bytes_per_row': size / len(rows), 'render_ms': render_ms}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=10000, help='Number of synthetic projects')
+    parser.add_argument('--renders', type=int, default=5, help='Renders averaged per row type')
+    args = parser.parse_args()
+
+    db_fd, db_path = tempfile.mkstemp()
+    try:
+        dal = DAL(db_path)
+        seed_projects(dal, args.rows)
+        for name, as_projects, template in (('dict', False, DICT_ROW), ('Project', True, PROJECT_ROW)):
+            result = measure(dal, as_projects, template, args.renders)
+            print(f"{name:>8}: {result['rows']} rows  load {result['load_ms']:8.2f} ms  "
+                  f"{result['bytes_per_row']:7.1f} B/row  render {result['render_ms']:8.2f} ms")
+        dal.close()
+    finally:
+        os.close(db_fd)
+        os.unlink(db_path)
+
+
+if __name__ == '__main__':
+    main()
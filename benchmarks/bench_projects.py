@@ -0,0 +1,81 @@
+"""
+Benchmark the /projects page: time to first byte and memory at scale
+
+Compares the streamed page against a fully buffered render of the same
+template. Run from the repository root:
+
+    python -m benchmarks.bench_projects --rows 10000
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+
+from flask import render_template
+
+import app as app_module
+from DAL import DAL
+from benchmarks.harness import seed_projects
+
+
+def measure_streamed(client) -> dict:
+    """Measure the streamed /projects response."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get('/projects', buffered=False)
+    chunks = iter(response.response)
+    size = len(next(chunks))
+    ttfb = time.perf_counter() - start
+    for chunk in chunks:
+        size += len(chunk)
+    total = time.perf_counter() - start
+    response.close()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'ttfb_ms': ttfb * 1000, 'total_ms': total * 1000, 'bytes': size, 'peak_kib': peak / 1024}
+
+
+def measure_buffered(flask_app, dal: DAL) -> dict:
+    """Measure a fully buffered render of the same page for comparison."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    with flask_app.test_request_context('/projects'):
+        rows = dal.execute_query("SELECT * FROM projects WHERE IsActive = 1 ORDER BY DateCreated DESC")
+        body = render_template('projects.html', projects=[dict(row) for row in rows])
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Nothing can be sent until the whole body exists
+    return {'ttfb_ms': total * 1000, 'total_ms': total * 1000, 'bytes': len(body.encode()), 'peak_kib': peak / 1024}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=10000, help='Number of synthetic projects')
+    args = parser.parse_args()
+
+    db_fd, db_path = tempfile.mkstemp()
+    try:
+        dal = DAL(db_path)
+        seed_projects(dal, args.rows)
+        app_module.dal = dal
+        flask_app = app_module.app
+        client = flask_app.test_client()
+
+        for name, result in (
+            ('streamed', measure_streamed(client)),
+            ('buffered', measure_buffered(flask_app, dal)),
+        ):
+            print(f"{name:>9}: ttfb {result['ttfb_ms']:8.2f} ms  total {result['total_ms']:8.2f} ms  "
+                  f"body {result['bytes'] / 1024:9.1f} KiB  peak heap {result['peak_kib']:9.1f} KiB")
+        # ru_maxrss is reported in KiB on Linux
+        print(f"process max RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss} KiB")
+    finally:
+        os.close(db_fd)
+        os.unlink(db_path)
+
+
+if __name__ == '__main__':
+    main()
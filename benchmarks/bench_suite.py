@@ -0,0 +1,84 @@
+"""
+pytest entry point for the benchmark suite
+
+The file name keeps it out of the default test run; pass it explicitly:
+
+    python -m pytest benchmarks/bench_suite.py -s
+    BENCH_SIZES=10,1000,100000 BENCH_OUTPUT=bench.json python -m pytest benchmarks/bench_suite.py -s
+
+Results written with BENCH_OUTPUT can be compared with
+python -m benchmarks.run --compare.
+"""
+import json
+import os
+
+import pytest
+
+from benchmarks.harness import (
+    fetch, measure, peak_memory, rounds_for, route_paths, run_metadata, seeded_app, throughput,
+)
+
+SIZES = [int(size) for size in os.environ.get('BENCH_SIZES', '10,1000').split(',') if size]
+
+
+@pytest.fixture(scope='session')
+def results():
+    """Collect results for the session and write them to BENCH_OUTPUT if set."""
+    collected = {}
+    yield collected
+    output = os.environ.get('BENCH_OUTPUT')
+    if output:
+        with open(output, 'w') as f:
+            json.dump({'meta': run_metadata(SIZES), 'results': collected}, f, indent=2)
+
+
+@pytest.fixture(scope='module', params=SIZES, ids=lambda rows: f'{rows}rows')
+def seeded(request):
+    """Yield (rows, app, dal) for a freshly seeded database."""
+    with seeded_app(request.param) as (flask_app, dal):
+        yield request.param, flask_app, dal
+
+
+def record(results, name, entry):
+    results[name] = entry
+    print(f"\n{name}: {entry['value']:.3f} {entry['unit']}")
+
+
+class TestDALBenchmarks:
+    """DAL read and write latency"""
+    
+    def test_select_by_id(self, seeded, results):
+        rows, _, dal = seeded
+        record(results, f'dal.select_by_id[{rows}]',
+               measure(lambda: dal.select_by_id('projects', 1, 'ProjectID'), 100, unit='us'))
+    
+    def test_select_all(self, seeded, results):
+        rows, _, dal = seeded
+        record(results, f'dal.select_all[{rows}]', measure(lambda: dal.select_all('projects'), rounds_for(rows, 5)))
+    
+    def test_insert(self, seeded, results):
+        rows, _, dal = seeded
+        record(results, f'dal.insert[{rows}]',
+               measure(lambda: dal.insert('projects', {'Title': 'Bench', 'IsActive': 0}), 100, unit='us'))
+
+
+class TestRouteBenchmarks:
+    """Route render time, memory and throughput"""
+    
+    def test_get_routes(self, seeded, results):
+        rows, flask_app, _ = seeded
+        client = flask_app.test_client()
+        for rule, path in route_paths(flask_app, 1):
+            entry = measure(lambda: fetch(client, path), rounds_for(rows, 5))
+            record(results, f'GET {rule}[{rows}]', entry)
+    
+    def test_projects_memory(self, seeded, results):
+        rows, flask_app, _ = seeded
+        client = flask_app.test_client()
+        record(results, f'memory GET /projects[{rows}]', peak_memory(lambda: fetch(client, '/projects')))
+    
+    def test_projects_throughput(self, seeded, results):
+        rows, flask_app, _ = seeded
+        entry = throughput(flask_app, '/projects', clients=4, requests_per_client=rounds_for(rows, 10))
+        assert entry['errors'] == 0
+        record(results, f'throughput GET /projects[{rows}]', entry)
@@ -0,0 +1,256 @@
+"""
+Shared helpers for the benchmark suite
+
+Seeds synthetic projects tables, points the Flask app at them, and times
+DAL calls and routes. Results are plain dicts so they can be written to
+JSON and compared between runs.
+"""
+import itertools
+import os
+import platform
+import resource
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from flask import url_for
+
+import app as app_module
+from DAL import DAL
+
+# Table sizes used when none are given
+DEFAULT_SIZES = (10, 1000, 100000)
+
+# Relative slowdown that counts as a regression when comparing runs
+DEFAULT_THRESHOLD = 0.10
+
+PROJECTS_SCHEMA = '''
+    ProjectID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Title TEXT NOT NULL,
+    Description TEXT,
+    ImageFileName TEXT,
+    TechnologiesUsed TEXT,
+    ProjectURL TEXT,
+    GitHubURL TEXT,
+    DateCreated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    IsActive INTEGER DEFAULT 1
+'''
+
+
+def seed_projects(dal: DAL, rows: int) -> None:
+    """Create the projects table and fill it with synthetic rows."""
+    dal.create_table('projects', PROJECTS_SCHEMA)
+    dal.execute_many(
+        "INSERT INTO projects (Title, Description, ImageFileName, TechnologiesUsed, "
+        "ProjectURL, GitHubURL, IsActive) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            (
+                f'Project {i}',
+                f'Synthetic project number {i} used for benchmarking',
+                f'project{i}.jpg',
+                'Python, Flask, SQLite',
+                f'https://example.com/project{i}',
+                f'https://github.com/user/project{i}',
+                # Every tenth project is inactive, like real archived work
+                0 if i % 10 == 9 else 1,
+            )
+            for i in range(rows)
+        ],
+    )
+
+
+@contextmanager
+def seeded_app(rows: int) -> Iterator[Tuple[object, DAL]]:
+    """Yield the Flask app wired to a temporary database with the given number of projects."""
+    db_fd, db_path = tempfile.mkstemp(suffix='.db')
+    feed_dir = tempfile.TemporaryDirectory()
+    original = app_module.dal
+    original_config = {key: app_module.app.config.get(key) for key in ('TESTING', 'FEED_CACHE_DIR')}
+    # Configured as app.py configures its DAL
+    dal = DAL(db_path, read_replica=True)
+    try:
+        seed_projects(dal, rows)
+        app_module.dal = dal
+        app_module.migrate()
+        app_module.app.config.update(TESTING=True, FEED_CACHE_DIR=feed_dir.name)
+        yield app_module.app, dal
+    finally:
+        app_module.dal = original
+        app_module.app.config.update(original_config)
+        dal.close()
+        feed_dir.cleanup()
+        os.close(db_fd)
+        os.unlink(db_path)
+
+
+def summarize(samples: List[float], unit: str = 'ms') -> Dict:
+    """Summarize timing samples (in seconds) as a result entry."""
+    scale = 1000 if unit == 'ms' else 1e6
+    ordered = sorted(sample * scale for sample in samples)
+    return {
+        'value': statistics.median(ordered),
+        'unit': unit,
+        'higher_is_better': False,
+        'min': ordered[0],
+        'mean': statistics.fmean(ordered),
+        'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'rounds': len(ordered),
+    }
+
+
+def measure(func: Callable[[], object], rounds: int = 5, warmup: int = 1, unit: str = 'ms') -> Dict:
+    """Time func over several rounds after warming up."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, unit)
+
+
+def peak_memory(func: Callable[[], object]) -> Dict:
+    """Return the Python heap high-water mark reached while running func."""
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'value': peak / 1024, 'unit': 'KiB', 'higher_is_better': False}
+
+
+def throughput(flask_app, path: str, clients: int, requests_per_client: int) -> Dict:
+    """Measure requests/sec for GET path with concurrent in-process clients."""
+    errors = []
+
+    def worker() -> None:
+        client = flask_app.test_client()
+        for _ in range(requests_per_client):
+            # Drain and close streamed bodies on this thread, inside their request context
+            status = fetch(client, path)
+            if status >= 400:
+                errors.append(status)
+
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    total = clients * requests_per_client
+    return {'value': total / elapsed, 'unit': 'req/s', 'higher_is_better': True,
+            'clients': clients, 'requests': total, 'errors': len(errors)}
+
+
+def fetch(client, path: str) -> int:
+    """GET path and read the whole body chunk by chunk, as a real client would; return the status."""
+    response = client.get(path, buffered=False)
+    try:
+        for _ in response.response:
+            pass
+    finally:
+        response.close()
+    return response.status_code
+
+
+def rounds_for(rows: int, base: int) -> int:
+    """Scale the number of rounds down for large tables so full scans stay affordable."""
+    return max(1, base * 1000 // max(rows, 1000))
+
+
+def route_paths(flask_app, sample_id: int) -> List[Tuple[str, str]]:
+    """List (rule, path) for every GET route, filling <int:...> arguments with sample_id."""
+    paths = []
+    for rule in flask_app.url_map.iter_rules():
+        if 'GET' not in rule.methods or rule.endpoint == 'static':
+            continue
+        values = {arg: sample_id for arg in rule.arguments}
+        with flask_app.test_request_context():
+            paths.append((rule.rule, url_for(rule.endpoint, **values)))
+    return sorted(paths)
+
+
+def run_suite(sizes=DEFAULT_SIZES, rounds: int = 5, clients: int = 8,
+              requests_per_client: int = 25, log: Optional[Callable[[str], None]] = None) -> Dict:
+    """Run every benchmark at every table size and return a results document."""
+    results: Dict[str, Dict] = {}
+
+    def record(name: str, entry: Dict) -> None:
+        results[name] = entry
+        if log:
+            log(f"{name:<48} {entry['value']:12.3f} {entry['unit']}")
+
+    for rows in sizes:
+        with seeded_app(rows) as (flask_app, dal):
+            client = flask_app.test_client()
+            n = rounds_for(rows, rounds)
+            sample_id = dal.execute_scalar("SELECT MIN(ProjectID) FROM projects WHERE IsActive = 1") or 1
+
+            # DAL reads and writes
+            record(f'dal.select_by_id[{rows}]', measure(
+                lambda: dal.select_by_id('projects', sample_id, 'ProjectID'), rounds * 20, unit='us'))
+            record(f'dal.select_all[{rows}]', measure(lambda: dal.select_all('projects'), n))
+            record(f'dal.insert[{rows}]', measure(
+                lambda: dal.insert('projects', {'Title': 'Bench', 'IsActive': 0}), rounds * 20, unit='us'))
+            # A changing value, since SQLite skips writing pages that did not change
+            counter = itertools.count()
+            record(f'dal.update[{rows}]', measure(
+                lambda: dal.update('projects', {'Description': f'Bench {next(counter)}'},
+                                   'ProjectID = ?', (sample_id,)),
+                rounds * 20, unit='us'))
+
+            # Every GET route, rendered in full
+            for rule, path in route_paths(flask_app, sample_id):
+                record(f'GET {rule}[{rows}]', measure(lambda: fetch(client, path), n))
+            record(f'POST /add_project[{rows}]', measure(lambda: client.post('/add_project', data={
+                'title': 'Bench', 'description': 'Bench', 'imagefilename': 'bench.jpg'}), rounds))
+
+            # fetch() reads the body chunk by chunk, so this is the server's
+            # footprint rather than the size of a buffered copy of the page
+            record(f'memory GET /projects[{rows}]', peak_memory(lambda: fetch(client, '/projects')))
+            record(f'throughput GET /projects[{rows}]', throughput(
+                flask_app, '/projects', clients, max(1, requests_per_client * n // rounds)))
+
+    return {'meta': run_metadata(sizes), 'results': results}
+
+
+def run_metadata(sizes) -> Dict:
+    """Describe the environment a results document was produced in."""
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'sizes': list(sizes),
+        # ru_maxrss is reported in KiB on Linux
+        'max_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """
+    Compare two results documents and return the regressions
+
+    A benchmark regresses when it is more than threshold (a fraction) worse
+    than the baseline in the direction given by its higher_is_better flag.
+    Benchmarks present in only one document are ignored.
+    """
+    regressions = []
+    for name, entry in current['results'].items():
+        base = baseline['results'].get(name)
+        if not base or not base['value']:
+            continue
+        change = (entry['value'] - base['value']) / base['value']
+        worse = -change if entry.get('higher_is_better') else change
+        if worse > threshold:
+            regressions.append({'name': name, 'baseline': base['value'], 'current': entry['value'],
+                                'unit': entry['unit'], 'change': change})
+    return regressions
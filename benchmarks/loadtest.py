@@ -0,0 +1,214 @@
+"""
+Load generator and traffic replay for capacity planning
+
+Replays a recorded request log, or a synthetic mix of page views, static
+assets and project submissions, at increasing concurrency and reports
+latency percentiles, error rate and throughput for each level.
+
+In-process against a seeded temporary database (the default):
+
+    python -m benchmarks.loadtest --concurrency 1,4,16 --requests 500
+
+Over localhost against a running server, replaying a log:
+
+    python -m benchmarks.loadtest --url http://127.0.0.1:5000 --log traffic.jsonl
+
+A log is JSON Lines with one request per line, for example
+{"method": "POST", "path": "/add_project", "form": {"title": "x"}}.
+method defaults to GET; lines without a path are skipped.
+"""
+import argparse
+import itertools
+import json
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+from benchmarks.harness import seeded_app
+
+# Weighted synthetic traffic: mostly reads, a trickle of writes
+SYNTHETIC_MIX = [
+    (60, {'method': 'GET', 'path': '/projects'}),
+    (15, {'method': 'GET', 'path': '/'}),
+    (15, {'method': 'GET', 'path': '/static/css/style.css'}),
+    (5, {'method': 'GET', 'path': '/api/projects'}),
+    (5, {'method': 'POST', 'path': '/add_project', 'form': {
+        'title': 'Load test project',
+        'description': 'Submitted by the load generator',
+        'imagefilename': 'loadtest.jpg',
+        'technologies': 'Python',
+    }}),
+]
+
+
+def load_log(path: str) -> List[Dict]:
+    """Read a JSON Lines request log, skipping lines that are not requests."""
+    requests = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(entry, dict) or not str(entry.get('path', '')).startswith('/'):
+                continue
+            requests.append({
+                'method': entry.get('method', 'GET').upper(),
+                'path': entry['path'],
+                'form': entry.get('form'),
+            })
+    return requests
+
+
+def synthetic_requests(count: int, seed: int = 0) -> List[Dict]:
+    """Draw count requests from SYNTHETIC_MIX, reproducibly."""
+    weights, specs = zip(*SYNTHETIC_MIX)
+    return random.Random(seed).choices(specs, weights=weights, k=count)
+
+
+class InProcessTarget:
+    """Send requests through Flask test clients, one per worker thread."""
+
+    def __init__(self, flask_app):
+        self.app = flask_app
+        self._local = threading.local()
+
+    def send(self, spec: Dict) -> int:
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(spec['path'], method=spec['method'], data=spec.get('form'))
+        # Read and close on this thread so streamed bodies finish in their own context
+        response.get_data()
+        response.close()
+        return response.status_code
+
+
+class HttpTarget:
+    """Send requests over HTTP to a running server."""
+
+    def __init__(self, base_url: str, timeout: float = 30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def send(self, spec: Dict) -> int:
+        data = urllib.parse.urlencode(spec['form']).encode() if spec.get('form') else None
+        request = urllib.request.Request(self.base_url + spec['path'], data=data, method=spec['method'])
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as error:
+            return error.code
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_level(target, requests: Iterable[Dict], concurrency: int) -> Dict:
+    """Send every request using concurrency worker threads and summarize the run."""
+    pending = iter(requests)
+    lock = threading.Lock()
+    latencies: List[float] = []
+    errors = []
+
+    def worker() -> None:
+        while True:
+            with lock:
+                spec = next(pending, None)
+            if spec is None:
+                return
+            start = time.perf_counter()
+            try:
+                status = target.send(spec)
+            except Exception as error:  # connection refused, timeouts, ...
+                status = repr(error)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                # Redirects are the normal answer to POST /add_project
+                if not isinstance(status, int) or status >= 400:
+                    errors.append(status)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    duration = time.perf_counter() - start
+
+    ordered = sorted(latency * 1000 for latency in latencies)
+    total = len(ordered)
+    return {
+        'concurrency': concurrency,
+        'requests': total,
+        'errors': len(errors),
+        'error_rate': len(errors) / total if total else 0.0,
+        'throughput_rps': total / duration if duration else 0.0,
+        'p50_ms': percentile(ordered, 0.50) if ordered else None,
+        'p90_ms': percentile(ordered, 0.90) if ordered else None,
+        'p99_ms': percentile(ordered, 0.99) if ordered else None,
+        'max_ms': ordered[-1] if ordered else None,
+        'mean_ms': statistics.fmean(ordered) if ordered else None,
+    }
+
+
+def run_ramp(target, requests: List[Dict], levels: Iterable[int], count: int,
+             log: Optional[Callable[[str], None]] = None) -> List[Dict]:
+    """Replay count requests (cycling through requests) at each concurrency level."""
+    curve = []
+    for concurrency in levels:
+        result = run_level(target, itertools.islice(itertools.cycle(requests), count), concurrency)
+        curve.append(result)
+        if log:
+            log(format_result(result))
+    return curve
+
+
+def format_result(result: Dict) -> str:
+    return (f"c={result['concurrency']:<4} {result['throughput_rps']:9.1f} req/s  "
+            f"p50 {result['p50_ms']:8.2f} ms  p90 {result['p90_ms']:8.2f} ms  "
+            f"p99 {result['p99_ms']:8.2f} ms  max {result['max_ms']:8.2f} ms  "
+            f"errors {result['errors']} ({result['error_rate']:.1%})")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Replay or synthesize traffic against the site.')
+    parser.add_argument('--url', help='Base URL of a running server (default: in-process)')
+    parser.add_argument('--log', help='JSON Lines request log to replay (default: synthetic mix)')
+    parser.add_argument('--concurrency', default='1,2,4,8,16', help='Comma-separated concurrency levels')
+    parser.add_argument('--requests', type=int, default=500, help='Requests sent at each level')
+    parser.add_argument('--rows', type=int, default=1000, help='Projects seeded for in-process runs')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic mix')
+    parser.add_argument('--output', help='Write the throughput curve as JSON to this path')
+    args = parser.parse_args(argv)
+
+    requests = load_log(args.log) if args.log else synthetic_requests(args.requests, args.seed)
+    if not requests:
+        parser.error(f'no replayable requests in {args.log}')
+    levels = [int(level) for level in args.concurrency.split(',') if level]
+
+    if args.url:
+        curve = run_ramp(HttpTarget(args.url), requests, levels, args.requests, log=print)
+    else:
+        with seeded_app(args.rows) as (flask_app, _):
+            curve = run_ramp(InProcessTarget(flask_app), requests, levels, args.requests, log=print)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'levels': curve}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Standalone benchmark runner
+
+Run the full suite and write the results as JSON:
+
+    python -m benchmarks.run --sizes 10,1000,100000 --output bench.json
+
+Compare a new run (or an existing results file) against a baseline and
+exit non-zero if anything regressed by more than the threshold:
+
+    python -m benchmarks.run --compare baseline.json --output bench.json
+    python -m benchmarks.run --compare baseline.json --current bench.json --threshold 0.15
+"""
+import argparse
+import json
+import sys
+
+from benchmarks.harness import DEFAULT_SIZES, DEFAULT_THRESHOLD, compare, run_suite
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Run the website benchmark suite.')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='Comma-separated projects table sizes to seed')
+    parser.add_argument('--rounds', type=int, default=5, help='Timed rounds per benchmark at 1k rows')
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent clients for throughput runs')
+    parser.add_argument('--output', help='Write results JSON to this path')
+    parser.add_argument('--compare', metavar='BASELINE', help='Baseline results JSON to compare against')
+    parser.add_argument('--current', help='Compare this results JSON instead of running the suite')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Allowed relative slowdown before flagging a regression')
+    args = parser.parse_args(argv)
+
+    if args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        sizes = [int(size) for size in args.sizes.split(',') if size]
+        current = run_suite(sizes, rounds=args.rounds, clients=args.clients, log=print)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(current, f, indent=2)
+            print(f"Results written to {args.output}")
+
+    if not args.compare:
+        return 0
+
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    regressions = compare(baseline, current, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression['name']}: {regression['baseline']:.3f} -> "
+              f"{regression['current']:.3f} {regression['unit']} ({regression['change']:+.1%})")
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,6 +4,7 @@ Pytest configuration and fixtures for Flask website tests
 import os
 import pytest
 import tempfile
+import app as app_module
 from app import app as flask_app
 from DAL import DAL
 
@@ -20,13 +21,17 @@ def app():
         'DATABASE': db_path,
     })
     
-    # Initialize test database
+    # Initialize test database and point the app at it, so tests never
+    # touch the repository's projects.db
     dal = DAL(db_path)
     create_test_database(dal)
+    repo_dal, app_module.dal = app_module.dal, dal
     
     yield flask_app
     
     # Cleanup
+    app_module.dal = repo_dal
+    dal.close()
     os.close(db_fd)
     os.unlink(db_path)
 
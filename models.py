@@ -0,0 +1,94 @@
+import json
+import sqlite3
+from typing import Any, Dict, Optional, Tuple
+
+
+class Project:
+    """A row of the projects table, built straight from a cursor"""
+    
+    __slots__ = ('id', 'Title', 'Description', 'ImageFileName', 'TechnologiesUsed', 'ProjectURL',
+                 'GitHubURL', 'DateCreated', 'DateUpdated', 'IsActive', '_tags')
+    
+    # Public fields in schema order, as used by as_dict()
+    FIELDS = __slots__[:-1]
+    
+    # Column names that map onto a differently named field
+    ALIASES = {'ProjectID': 'id'}
+    
+    # (cursor.description, column index for each field) of the last cursor
+    # seen; a statement's description object is reused for every row
+    _layout: Tuple[Any, Tuple[Tuple[str, Optional[int]], ...]] = (None, ())
+    
+    def __init__(self, **values: Any):
+        """
+        Create a project from field values
+        
+        Args:
+            values: Field values by name; missing fields are None
+        """
+        for field in self.FIELDS:
+            setattr(self, field, values.get(field))
+        self._tags = None
+    
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: tuple) -> 'Project':
+        """
+        Row factory for sqlite3 cursors
+        
+        Columns that are not project fields are ignored and fields that were
+        not selected are None.
+        
+        Args:
+            cursor: Cursor the row came from
+            row: Raw column values
+            
+        Returns:
+            Project for the row
+        """
+        description, layout = cls._layout
+        if description is not cursor.description:
+            description = cursor.description
+            columns = [cls.ALIASES.get(column[0], column[0]) for column in description]
+            layout = tuple((field, columns.index(field) if field in columns else None) for field in cls.FIELDS)
+            cls._layout = (description, layout)
+        project = cls.__new__(cls)
+        for field, index in layout:
+            setattr(project, field, None if index is None else row[index])
+        project._tags = None
+        return project
+    
+    @property
+    def ProjectID(self) -> Optional[int]:
+        """Primary key, for databases that name the column ProjectID"""
+        return self.id
+    
+    @property
+    def tags(self) -> Tuple[str, ...]:
+        """Technologies listed in TechnologiesUsed, split and stripped once"""
+        if self._tags is None:
+            raw = self.TechnologiesUsed or ''
+            self._tags = tuple(tag for tag in (part.strip() for part in raw.split(',')) if tag)
+        return self._tags
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Get the project's fields as a dictionary
+        
+        Returns:
+            Dictionary of field names and values, including parsed tags
+        """
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        data['tags'] = list(self.tags)
+        return data
+    
+    def to_json(self) -> str:
+        """
+        Serialize the project as a JSON object
+        
+        Returns:
+            JSON text of as_dict()
+        """
+        return json.dumps(self.as_dict(), separators=(',', ':'))
+    
+    def __repr__(self) -> str:
+        return f"Project(id={self.id!r}, Title={self.Title!r})"
@@ -0,0 +1,123 @@
+"""
+Tests for the benchmark harness and load generator helpers
+"""
+import json
+import threading
+
+from werkzeug.serving import make_server
+
+from benchmarks.harness import compare, fetch, peak_memory, seeded_app, summarize
+from benchmarks.loadtest import HttpTarget, InProcessTarget, load_log, run_level, synthetic_requests
+
+
+def make_results(**values):
+    return {'results': {name: dict(entry) for name, entry in values.items()}}
+
+
+class TestCompare:
+    """Test suite for regression detection between benchmark runs"""
+    
+    def test_slower_latency_is_a_regression(self):
+        """Test that latency growing past the threshold is flagged"""
+        baseline = make_results(a={'value': 10.0, 'unit': 'ms', 'higher_is_better': False})
+        current = make_results(a={'value': 12.0, 'unit': 'ms', 'higher_is_better': False})
+        regressions = compare(baseline, current, threshold=0.1)
+        assert [r['name'] for r in regressions] == ['a']
+        assert round(regressions[0]['change'], 2) == 0.2
+    
+    def test_lower_throughput_is_a_regression(self):
+        """Test that higher-is-better metrics regress when they drop"""
+        baseline = make_results(rps={'value': 100.0, 'unit': 'req/s', 'higher_is_better': True})
+        current = make_results(rps={'value': 80.0, 'unit': 'req/s', 'higher_is_better': True})
+        assert len(compare(baseline, current, threshold=0.1)) == 1
+        assert compare(current, baseline, threshold=0.1) == []
+    
+    def test_within_threshold_and_new_benchmarks_pass(self):
+        """Test that small changes and benchmarks missing from the baseline are ignored"""
+        baseline = make_results(a={'value': 10.0, 'unit': 'ms'})
+        current = make_results(a={'value': 10.5, 'unit': 'ms'}, b={'value': 99.0, 'unit': 'ms'})
+        assert compare(baseline, current, threshold=0.1) == []
+
+
+class TestHarness:
+    """Test suite for seeding and summarizing"""
+    
+    def test_seeded_app_swaps_and_restores_dal(self):
+        """Test that the app is pointed at a seeded database only inside the block"""
+        import app as app_module
+        original = app_module.dal
+        with seeded_app(20) as (flask_app, dal):
+            assert app_module.dal is dal
+            assert dal.execute_scalar("SELECT COUNT(*) FROM projects") == 20
+            assert dal.execute_scalar("SELECT COUNT(*) FROM projects WHERE IsActive = 0") == 2
+        assert app_module.dal is original
+    
+    def test_seeded_app_uses_read_replica(self):
+        """Test that benchmarks run against the DAL configuration app.py uses"""
+        with seeded_app(20) as (_, dal):
+            dal.execute_scalar("SELECT 1")
+            assert dal.replica_status()['active']
+    
+    def test_streamed_memory_is_not_buffered(self):
+        """Test that measuring /projects does not count a buffered copy of the page"""
+        with seeded_app(2000) as (flask_app, _):
+            client = flask_app.test_client()
+            assert fetch(client, '/projects') == 200
+            # A buffered body for 2000 rows alone is over 10 MiB
+            assert peak_memory(lambda: fetch(client, '/projects'))['value'] < 2048
+    
+    def test_summarize(self):
+        """Test that samples in seconds are summarized in the requested unit"""
+        entry = summarize([0.001, 0.003, 0.002])
+        assert entry['value'] == 2.0
+        assert entry['min'] == 1.0
+        assert entry['rounds'] == 3
+
+
+class TestLoadTest:
+    """Test suite for the load generator"""
+    
+    def test_load_log_skips_non_requests(self, tmp_path):
+        """Test that only lines with a path are replayed"""
+        log = tmp_path / 'traffic.jsonl'
+        log.write_text('\n'.join([
+            json.dumps({'path': '/projects'}),
+            json.dumps({'method': 'post', 'path': '/add_project', 'form': {'title': 'x'}}),
+            json.dumps({'request_id': 'abc', 'title': 'not a request'}),
+            'not json',
+            '',
+        ]))
+        assert load_log(str(log)) == [
+            {'method': 'GET', 'path': '/projects', 'form': None},
+            {'method': 'POST', 'path': '/add_project', 'form': {'title': 'x'}},
+        ]
+    
+    def test_synthetic_mix_is_reproducible(self):
+        """Test that the same seed draws the same requests"""
+        assert synthetic_requests(50, seed=1) == synthetic_requests(50, seed=1)
+        assert {spec['path'] for spec in synthetic_requests(200)} >= {'/projects', '/add_project'}
+    
+    def test_run_level_in_process(self):
+        """Test a concurrent in-process run against a seeded database"""
+        with seeded_app(20) as (flask_app, dal):
+            result = run_level(InProcessTarget(flask_app), synthetic_requests(40), concurrency=4)
+        assert result['requests'] == 40
+        assert result['errors'] == 0
+        assert result['p50_ms'] <= result['p99_ms'] <= result['max_ms']
+    
+    def test_run_level_over_http(self):
+        """Test replaying against a real server on localhost"""
+        with seeded_app(5) as (flask_app, dal):
+            server = make_server('127.0.0.1', 0, flask_app, threaded=True)
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+            try:
+                target = HttpTarget(f'http://127.0.0.1:{server.server_port}')
+                requests = [{'method': 'GET', 'path': '/projects'}, {'method': 'GET', 'path': '/missing'}]
+                result = run_level(target, requests * 5, concurrency=2)
+            finally:
+                server.shutdown()
+                thread.join()
+        assert result['requests'] == 10
+        assert result['errors'] == 5
+        assert result['error_rate'] == 0.5
@@ -1,11 +1,13 @@
 """
 Tests for the Data Access Layer (DAL)
 """
+import json
 import pytest
 import sqlite3
 import os
 import tempfile
-from DAL import DAL
+import threading
+from DAL import DAL, _ReplicaConnection
 
 
 class TestDALBasicOperations:
@@ -48,6 +50,26 @@ class TestDALQueries:
         assert len(results) == 1
         assert results[0]['Title'] == 'Test Project 1'
     
+    def test_iter_query(self, test_dal):
+        """Test that iter_query yields the same rows lazily"""
+        rows = test_dal.iter_query("SELECT * FROM projects ORDER BY Title", batch_size=1)
+        assert not isinstance(rows, list)
+        titles = [row['Title'] for row in rows]
+        assert titles == ['Inactive Project', 'Test Project 1', 'Test Project 2']
+    
+    def test_iter_query_does_not_block_writers(self, test_dal):
+        """Test that an unfinished streamed read leaves the database writable"""
+        rows = test_dal.iter_query("SELECT * FROM projects ORDER BY ProjectID", batch_size=1)
+        assert next(rows)['ProjectID'] == 1
+        writer = sqlite3.connect(test_dal.db_path, timeout=0.1)
+        try:
+            writer.execute("INSERT INTO projects (Title) VALUES ('Written mid-stream')")
+            writer.commit()
+        finally:
+            writer.close()
+        assert len(list(rows)) == 2
+        assert test_dal.execute_scalar("SELECT COUNT(*) FROM projects") == 4
+    
     def test_execute_scalar(self, test_dal):
         """Test executing a scalar query"""
         count = test_dal.execute_scalar("SELECT COUNT(*) FROM projects")
@@ -130,6 +152,18 @@ class TestDALUpdate:
         assert result['Title'] == 'Updated Title'
         assert result['TechnologiesUsed'] == 'New Tech Stack'
         assert result['IsActive'] == 0
+    
+    def test_update_stamps_date_updated(self, test_dal):
+        """Test that DateUpdated is maintained on tables that have it"""
+        test_dal.create_table('posts', 'id INTEGER PRIMARY KEY, body TEXT, DateUpdated TIMESTAMP')
+        post_id = test_dal.insert('posts', {'body': 'draft'})
+        assert test_dal.select_by_id('posts', post_id)['DateUpdated'] is None
+        
+        test_dal.update('posts', {'body': 'final'}, 'id = ?', (post_id,))
+        assert test_dal.select_by_id('posts', post_id)['DateUpdated'] is not None
+        
+        test_dal.update('posts', {'DateUpdated': '2000-01-01 00:00:00'}, 'id = ?', (post_id,))
+        assert test_dal.select_by_id('posts', post_id)['DateUpdated'] == '2000-01-01 00:00:00'
 
 
 class TestDALDelete:
@@ -180,6 +214,30 @@ class TestDALSelect:
         assert result is not None
         assert result['ProjectID'] == project_id
     
+    def test_select_by_id_columns(self, test_dal):
+        """Test selecting only some columns of a project by ID"""
+        result = test_dal.select_by_id('projects', 1, 'ProjectID', ['Title', 'IsActive'])
+        assert result.keys() == ['Title', 'IsActive']
+        assert result['Title'] == 'Test Project 1'
+    
+    def test_select_json_page(self, test_dal):
+        """Test keyset pagination with rows encoded as JSON by SQLite"""
+        page = test_dal.select_json_page('projects', ['ProjectID', 'Title'], 'ProjectID', limit=2)
+        assert [key for key, _ in page] == [1, 2]
+        assert json.loads(page[0][1]) == {'ProjectID': 1, 'Title': 'Test Project 1'}
+        
+        page = test_dal.select_json_page('projects', ['Title'], 'ProjectID', after=2,
+                                         where_clause='IsActive = ?', where_params=(0,))
+        assert [json.loads(obj) for _, obj in page] == [{'Title': 'Inactive Project'}]
+    
+    def test_get_columns_and_primary_key(self, test_dal):
+        """Test schema introspection helpers"""
+        columns = test_dal.get_columns('projects')
+        assert columns[0] == 'ProjectID'
+        assert 'TechnologiesUsed' in columns
+        assert test_dal.get_primary_key('projects') == 'ProjectID'
+        assert test_dal.get_columns('nonexistent_table') == []
+    
     def test_select_by_id_not_found(self, test_dal):
         """Test selecting a non-existent project"""
         result = test_dal.select_by_id('projects', 99999, 'ProjectID')
@@ -241,6 +299,451 @@ class TestDALExecuteMany:
         assert len(results) == 3
 
 
+class TestDALConnectionPool:
+    """Test suite for pooled connections and cached SQL"""
+    
+    def test_connection_is_reused(self, test_dal):
+        """Test that a released connection is handed out again"""
+        with test_dal.connection() as first:
+            pass
+        with test_dal.connection() as second:
+            assert second is first
+    
+    def test_pool_disabled(self, test_dal):
+        """Test that pool_size=0 closes connections after use"""
+        dal = DAL(test_dal.db_path, pool_size=0)
+        with dal.connection() as first:
+            pass
+        with dal.connection() as second:
+            assert second is not first
+        assert dal.execute_scalar("SELECT COUNT(*) FROM projects") == 3
+    
+    def test_failed_write_is_rolled_back(self, test_dal):
+        """Test that an open transaction is not leaked back into the pool"""
+        with pytest.raises(sqlite3.IntegrityError):
+            test_dal.insert('projects', {'Description': 'Missing title'})
+        with test_dal.connection() as conn:
+            assert not conn.in_transaction
+    
+    def test_sql_is_built_once(self, test_dal):
+        """Test that helper SQL is cached per table and column set"""
+        test_dal.select_by_id('projects', 1, 'ProjectID')
+        test_dal.select_by_id('projects', 2, 'ProjectID')
+        keys = [key for key in test_dal._sql_cache if key[0] == 'select_by_id']
+        assert keys == [('select_by_id', 'projects', 'ProjectID', ())]
+    
+    def test_schema_change_refreshes_cache(self, test_dal):
+        """Test that DDL through the DAL invalidates cached schema"""
+        test_dal.create_table('notes', 'id INTEGER PRIMARY KEY, body TEXT')
+        test_dal.insert('notes', {'body': 'first'})
+        test_dal.drop_table('notes')
+        test_dal.create_table('notes', 'id INTEGER PRIMARY KEY, text TEXT')
+        assert test_dal.insert('notes', {'text': 'second'}) == 1
+
+
+class TestDALReadReplica:
+    """Test suite for the in-memory read replica"""
+    
+    @pytest.fixture
+    def replica_dal(self, test_dal):
+        dal = DAL(test_dal.db_path, read_replica=True, replica_check_interval=3600)
+        yield dal
+        dal.close()
+    
+    def test_reads_served_from_memory(self, replica_dal):
+        """Test that reads come from the replica once loaded"""
+        assert replica_dal.execute_scalar("SELECT COUNT(*) FROM projects") == 3
+        status = replica_dal.replica_status()
+        assert status['active'] and status['generation'] == 1
+        with replica_dal.read_connection() as conn:
+            assert conn.execute("PRAGMA database_list").fetchone()['file'] == ''
+    
+    def test_own_writes_are_visible(self, replica_dal):
+        """Test that insert, update and delete rebuild the replica"""
+        replica_dal.execute_scalar("SELECT 1")
+        project_id = replica_dal.insert('projects', {'Title': 'Replica', 'IsActive': 1})
+        assert replica_dal.select_by_id('projects', project_id, 'ProjectID')['Title'] == 'Replica'
+        replica_dal.update('projects', {'Title': 'Renamed'}, 'ProjectID = ?', (project_id,))
+        assert replica_dal.select_by_id('projects', project_id, 'ProjectID')['Title'] == 'Renamed'
+        replica_dal.delete('projects', 'ProjectID = ?', (project_id,))
+        assert replica_dal.select_by_id('projects', project_id, 'ProjectID') is None
+    
+    def test_external_writes_seen_after_check_interval(self, test_dal):
+        """Test that writes from other connections are picked up on the next check"""
+        dal = DAL(test_dal.db_path, read_replica=True, replica_check_interval=3600)
+        dal.execute_scalar("SELECT 1")
+        test_dal.insert('projects', {'Title': 'Elsewhere', 'IsActive': 1})
+        assert dal.execute_scalar("SELECT COUNT(*) FROM projects") == 3
+        dal._replica.check_interval = 0
+        assert dal.execute_scalar("SELECT COUNT(*) FROM projects") == 4
+        dal.close()
+    
+    def test_streaming_reader_survives_rebuild(self, replica_dal):
+        """Test that an open iterator keeps reading its generation after a write"""
+        rows = replica_dal.iter_query("SELECT Title FROM projects ORDER BY ProjectID", batch_size=1)
+        assert next(rows)['Title'] == 'Test Project 1'
+        replica_dal.insert('projects', {'Title': 'Added mid-stream', 'IsActive': 1})
+        assert [row['Title'] for row in rows] == ['Test Project 2', 'Inactive Project']
+        assert replica_dal.replica_status()['generation'] == 1
+        assert replica_dal.execute_scalar("SELECT COUNT(*) FROM projects") == 4
+        assert replica_dal.replica_status()['generation'] == 2
+    
+    def test_reader_during_rebuild_is_not_pooled(self, replica_dal, monkeypatch):
+        """Test that a connection opened mid-rebuild is not reused for the new generation"""
+        replica = replica_dal._replica
+        replica_dal.execute_scalar("SELECT 1")
+        drop = replica._drop
+        
+        def drop_with_reader():
+            # A reader that arrives while the new copy loads and finishes after the swap
+            conn = replica.acquire()
+            drop()
+            replica.release(conn)
+        
+        monkeypatch.setattr(replica, '_drop', drop_with_reader)
+        replica_dal.insert('projects', {'Title': 'Mid-rebuild', 'IsActive': 1})
+        assert replica_dal.execute_scalar("SELECT COUNT(*) FROM projects") == 4
+        assert replica_dal.execute_scalar("SELECT COUNT(*) FROM projects") == 4
+    
+    def test_reader_racing_rebuild_reads_disk(self, replica_dal, monkeypatch):
+        """Test that a connection opened after its generation was dropped is not used"""
+        replica = replica_dal._replica
+        replica_dal.execute_scalar("SELECT 1")
+        raced = []
+        
+        class RacingConnection(_ReplicaConnection):
+            def __init__(self, *args, **kwargs):
+                if not raced:
+                    # The copy is rebuilt between reading the uri and connecting to it
+                    raced.append(True)
+                    replica.invalidate()
+                    replica._refresh()
+                super().__init__(*args, **kwargs)
+        
+        monkeypatch.setattr('DAL._ReplicaConnection', RacingConnection)
+        # Close the pooled connection so this read opens a new one
+        replica._pool.get_nowait().close()
+        assert replica_dal.execute_scalar("SELECT COUNT(*) FROM projects") == 3
+        assert raced
+        assert replica_dal.execute_scalar("SELECT COUNT(*) FROM projects") == 3
+    
+    def test_memory_cap_falls_back_to_disk(self, test_dal):
+        """Test that a database over the cap is read from disk"""
+        dal = DAL(test_dal.db_path, read_replica=True, replica_max_bytes=1)
+        assert dal.execute_scalar("SELECT COUNT(*) FROM projects") == 3
+        status = dal.replica_status()
+        assert not status['active']
+        assert 'over the 1 byte cap' in status['fallback_reason']
+        assert test_dal.replica_status() is None
+
+
+class TestDALChangeLog:
+    """Test suite for the change log and change feed"""
+    
+    def changes(self, dal, since=0, **kwargs):
+        return [(change_id, op, row_id, json.loads(data) if data else None)
+                for change_id, op, row_id, data in dal.iter_changes('projects', since, **kwargs)]
+    
+    def test_existing_rows_are_seeded(self, test_dal):
+        """Test that enabling the log records the current table once"""
+        assert test_dal.enable_change_log('projects') == 'projects_changes'
+        test_dal.enable_change_log('projects')
+        assert [(op, row_id) for _, op, row_id, _ in self.changes(test_dal)] == [
+            ('insert', 1), ('insert', 2), ('delete', 3)]
+    
+    def test_concurrent_enable_seeds_once(self, test_dal):
+        """Test that workers enabling the log together do not seed it twice"""
+        barrier = threading.Barrier(4)
+        errors = []
+        
+        def enable():
+            dal = DAL(test_dal.db_path)
+            barrier.wait()
+            try:
+                dal.enable_change_log('projects')
+            except Exception as error:
+                errors.append(error)
+            finally:
+                dal.close()
+        
+        threads = [threading.Thread(target=enable) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors
+        assert [(op, row_id) for _, op, row_id, _ in self.changes(test_dal)] == [
+            ('insert', 1), ('insert', 2), ('delete', 3)]
+    
+    def test_writes_are_logged(self, test_dal):
+        """Test inserts, updates, soft deletes and hard deletes"""
+        test_dal.enable_change_log('projects')
+        cursor = self.changes(test_dal)[-1][0]
+        
+        project_id = test_dal.insert('projects', {'Title': 'Logged', 'IsActive': 1})
+        test_dal.update('projects', {'Title': 'Renamed'}, 'ProjectID = ?', (project_id,))
+        test_dal.update('projects', {'IsActive': 0}, 'ProjectID = ?', (1,))
+        test_dal.update('projects', {'IsActive': 1}, 'ProjectID = ?', (3,))
+        test_dal.delete('projects', 'ProjectID = ?', (2,))
+        
+        changes = self.changes(test_dal, cursor, columns=['Title'])
+        assert [(op, row_id) for _, op, row_id, _ in changes] == [
+            ('insert', project_id), ('update', project_id), ('delete', 1), ('insert', 3), ('delete', 2)]
+        # Rows carry current values; deletes carry none
+        assert changes[0][3] == changes[1][3] == {'Title': 'Renamed'}
+        assert changes[2][3] is None and changes[4][3] is None
+        assert [c[0] for c in changes] == sorted(c[0] for c in changes)
+    
+    def test_inactive_rows_are_not_published(self, test_dal):
+        """Test that inactive inserts and edits to inactive rows never carry a payload"""
+        test_dal.enable_change_log('projects')
+        cursor = self.changes(test_dal)[-1][0]
+        
+        draft_id = test_dal.insert('projects', {'Title': 'Hidden draft', 'IsActive': 0})
+        test_dal.update('projects', {'Title': 'Secret edit'}, 'ProjectID = ?', (3,))
+        assert [(op, row_id, data) for _, op, row_id, data in self.changes(test_dal, cursor)] == [
+            ('delete', draft_id, None)]
+    
+    def test_deactivated_row_hides_older_entries(self, test_dal):
+        """Test that earlier entries stop exposing a row once it is deactivated"""
+        test_dal.enable_change_log('projects')
+        test_dal.update('projects', {'Title': 'Edited'}, 'ProjectID = ?', (1,))
+        test_dal.update('projects', {'IsActive': 0}, 'ProjectID = ?', (1,))
+        entries = [c for c in self.changes(test_dal) if c[2] == 1]
+        assert [op for _, op, _, _ in entries] == ['insert', 'update', 'delete']
+        assert all(data is None for _, _, _, data in entries)
+    
+    def test_reenabling_upgrades_triggers(self, test_dal):
+        """Test that calling enable_change_log again replaces triggers from older versions"""
+        test_dal.enable_change_log('projects')
+        test_dal.execute_non_query("DROP TRIGGER projects_changes_insert")
+        test_dal.execute_non_query(
+            "CREATE TRIGGER projects_changes_insert AFTER INSERT ON projects BEGIN "
+            "INSERT INTO projects_changes (RowID, Operation) VALUES (NEW.ProjectID, 'insert'); END")
+        test_dal.enable_change_log('projects')
+        cursor = self.changes(test_dal)[-1][0]
+        test_dal.insert('projects', {'Title': 'Hidden draft', 'IsActive': 0})
+        assert [op for _, op, _, _ in self.changes(test_dal, cursor)] == ['delete']
+    
+    def test_change_version(self, test_dal):
+        """Test that the version only moves when the table changes"""
+        test_dal.enable_change_log('projects')
+        version = test_dal.change_version('projects')
+        assert version == 3
+        test_dal.execute_query("SELECT * FROM projects")
+        assert test_dal.change_version('projects') == version
+        test_dal.update('projects', {'Title': 'Bumped'}, 'ProjectID = ?', (1,))
+        assert test_dal.change_version('projects') == version + 1
+    
+    def test_limit(self, test_dal):
+        """Test paging through the feed"""
+        test_dal.enable_change_log('projects')
+        first = self.changes(test_dal, limit=2)
+        rest = self.changes(test_dal, first[-1][0])
+        assert [c[2] for c in first + rest] == [1, 2, 3]
+
+
+class TestDALArchive:
+    """Test suite for archiving rows and reclaiming space"""
+    
+    def test_archive_rows(self, test_dal):
+        """Test that matching rows move to the archive table in batches"""
+        test_dal.execute_many("INSERT INTO projects (Title, IsActive) VALUES (?, ?)",
+                              [(f'Old {i}', 0) for i in range(5)])
+        moved = test_dal.archive_rows('projects', 'IsActive = ?', (0,), batch_size=2)
+        assert moved == 6
+        assert test_dal.execute_scalar("SELECT COUNT(*) FROM projects") == 2
+        assert test_dal.execute_scalar("SELECT COUNT(*) FROM projects_archive") == 6
+        archived = test_dal.select_by_id('projects_archive', 3, 'ProjectID')
+        assert archived['Title'] == 'Inactive Project'
+        assert archived['TechnologiesUsed'] == 'Java'
+        assert test_dal.archive_rows('projects', 'IsActive = ?', (0,)) == 0
+    
+    def test_archive_skips_rows_changed_mid_batch(self, test_dal):
+        """Test that a project reactivated while its batch is chosen is not archived"""
+        reactivated = []
+        
+        def reactivate(statement):
+            if statement.startswith('SELECT ProjectID FROM projects') and not reactivated:
+                other = sqlite3.connect(test_dal.db_path, timeout=0.05)
+                try:
+                    other.execute("UPDATE projects SET IsActive = 1 WHERE ProjectID = 3")
+                    other.commit()
+                    reactivated.append(True)
+                except sqlite3.OperationalError:
+                    reactivated.append(False)
+                finally:
+                    other.close()
+        
+        with test_dal.connection() as conn:
+            conn.set_trace_callback(reactivate)
+        try:
+            test_dal.archive_rows('projects', 'IsActive = ?', (0,))
+        finally:
+            with test_dal.connection() as conn:
+                conn.set_trace_callback(None)
+        assert reactivated == [False]
+        assert test_dal.execute_scalar("SELECT COUNT(*) FROM projects_archive WHERE IsActive = 1") == 0
+    
+    def test_archive_follows_new_columns(self, test_dal):
+        """Test that columns added to the table later reach the archive"""
+        test_dal.archive_rows('projects', 'ProjectID = ?', (1,))
+        test_dal.execute_non_query("ALTER TABLE projects ADD COLUMN Notes TEXT")
+        test_dal.update('projects', {'Notes': 'kept'}, 'ProjectID = ?', (2,))
+        test_dal.archive_rows('projects', 'ProjectID = ?', (2,))
+        assert test_dal.select_by_id('projects_archive', 2, 'ProjectID')['Notes'] == 'kept'
+    
+    def test_archive_is_logged_as_delete(self, test_dal):
+        """Test that change log consumers see archived rows go away"""
+        test_dal.enable_change_log('projects')
+        test_dal.archive_rows('projects', 'ProjectID = ?', (1,))
+        last = list(test_dal.iter_changes('projects'))[-1]
+        assert last[1:3] == ('delete', 1)
+    
+    def test_incremental_vacuum(self, test_dal):
+        """Test that freed pages are returned to the filesystem"""
+        first = test_dal.incremental_vacuum()
+        assert first['converted']
+        test_dal.execute_many("INSERT INTO projects (Title, Description) VALUES (?, ?)",
+                              [('Bulk', 'x' * 2000) for _ in range(200)])
+        test_dal.delete('projects', 'Title = ?', ('Bulk',))
+        stats = test_dal.incremental_vacuum()
+        assert not stats['converted']
+        assert stats['pages_freed'] > 0
+        assert stats['bytes_reclaimed'] > 0
+        assert stats['free_pages'] == 0
+        assert os.path.getsize(test_dal.db_path) == stats['bytes_after']
+    
+    def test_conversion_reported_separately(self, test_dal):
+        """Test that growth from the one-time conversion never shows as negative reclaimed space"""
+        pages = test_dal.execute_scalar("PRAGMA page_count")
+        page_size = test_dal.execute_scalar("PRAGMA page_size")
+        stats = test_dal.incremental_vacuum()
+        assert stats['converted']
+        # Pointer-map pages make the converted file bigger
+        assert stats['conversion_bytes'] > 0
+        assert stats['bytes_before'] == pages * page_size + stats['conversion_bytes']
+        assert stats['bytes_reclaimed'] == 0
+    
+    def test_incremental_vacuum_limited(self, test_dal):
+        """Test freeing only some pages per run"""
+        test_dal.incremental_vacuum()
+        test_dal.execute_many("INSERT INTO projects (Title, Description) VALUES (?, ?)",
+                              [('Bulk', 'x' * 2000) for _ in range(200)])
+        test_dal.delete('projects', 'Title = ?', ('Bulk',))
+        stats = test_dal.incremental_vacuum(pages=10)
+        assert stats['pages_freed'] == 10
+        assert stats['free_pages'] > 0
+
+
+class TestDALHealth:
+    """Test suite for health and readiness information"""
+    
+    def test_probe(self, test_dal):
+        """Test a successful probe"""
+        test_dal.execute_non_query("PRAGMA user_version = 3")
+        result = test_dal.probe()
+        assert result['ok']
+        assert result['error'] is None
+        assert result['user_version'] == 3
+        assert result['latency_ms'] >= 0
+    
+    def test_probe_missing_database(self, tmp_path):
+        """Test that a broken database path fails the probe instead of creating a file"""
+        dal = DAL(str(tmp_path / 'missing.db'))
+        result = dal.probe()
+        assert not result['ok']
+        assert result['error']
+        assert not (tmp_path / 'missing.db').exists()
+    
+    def test_probe_does_not_wait_for_writer(self, test_dal):
+        """Test that an exclusive write lock makes the probe fail fast"""
+        # WAL readers never wait for a writer, so lock out readers in rollback mode
+        test_dal.close()
+        writer = sqlite3.connect(test_dal.db_path, isolation_level=None)
+        writer.execute("PRAGMA journal_mode = DELETE")
+        writer.execute("BEGIN EXCLUSIVE")
+        try:
+            result = test_dal.probe(timeout=0.05)
+        finally:
+            writer.execute("ROLLBACK")
+            writer.close()
+        assert not result['ok']
+        assert 'locked' in result['error']
+        assert result['latency_ms'] < 1000
+    
+    def test_pool_status(self, test_dal):
+        """Test that borrowed connections count towards saturation"""
+        with test_dal.connection():
+            with test_dal.connection():
+                status = test_dal.pool_status()
+                assert status['in_use'] == 2
+                assert status['saturation'] == 2 / test_dal.pool_size
+        status = test_dal.pool_status()
+        assert status['in_use'] == 0
+        assert status['idle'] == 2
+    
+    def test_health_reports_last_write(self, test_dal):
+        """Test that health includes write latency and cache state"""
+        assert test_dal.health()['last_write_ms'] is not None  # fixture inserts
+        test_dal.update('projects', {'Title': 'Timed'}, 'ProjectID = ?', (1,))
+        health = test_dal.health()
+        assert health['last_write_ms'] > 0
+        assert health['sql_cache_entries'] > 0
+        assert 'projects' in health['cached_tables']
+        assert health['replica'] is None
+
+
+class TestDALBackup:
+    """Test suite for online backups"""
+    
+    def test_backup_plain(self, test_dal, tmp_path):
+        """Test that a backup is a complete, readable copy"""
+        dest = tmp_path / 'backup.db'
+        stats = test_dal.backup(str(dest), pages=1, sleep=0)
+        assert stats['integrity'] == 'ok'
+        assert stats['steps'] == stats['pages'] > 1
+        assert stats['bytes'] == dest.stat().st_size
+        # The live database is in WAL mode; the snapshot stays a single file
+        assert dest.read_bytes()[18:20] == b'\x01\x01'
+        assert DAL(str(dest)).execute_scalar("SELECT COUNT(*) FROM projects") == 3
+    
+    def test_backup_compressed(self, test_dal, tmp_path):
+        """Test gzip snapshots are verified after decompression"""
+        dest = tmp_path / 'backup.db.gz'
+        stats = test_dal.backup(str(dest))
+        assert stats['integrity'] == 'ok'
+        assert stats['compressed_bytes'] == dest.stat().st_size < stats['bytes']
+        assert sorted(p.name for p in tmp_path.iterdir()) == ['backup.db.gz']
+    
+    def test_compress_flag_overrides_extension(self, test_dal, tmp_path, monkeypatch):
+        """Test that verification follows the compress flag, not the file name"""
+        monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+        packed = test_dal.backup(str(tmp_path / 'packed.db'), compress=True)
+        assert packed['integrity'] == 'ok'
+        assert 'compressed_bytes' in packed
+        plain = test_dal.backup(str(tmp_path / 'plain.gz'), compress=False)
+        assert plain['integrity'] == 'ok'
+        assert 'compressed_bytes' not in plain
+        assert DAL.verify_backup(str(tmp_path / 'packed.db')) == 'ok'
+        assert DAL.verify_backup(str(tmp_path / 'plain.gz')) == 'ok'
+        assert sorted(p.name for p in tmp_path.iterdir()) == ['packed.db', 'plain.gz']
+    
+    def test_verify_backup_bad_gzip(self, tmp_path, monkeypatch):
+        """Test that a file that is not gzip fails verification without leaving temp files"""
+        monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+        dest = tmp_path / 'broken.db.gz'
+        dest.write_bytes(b'not a database' * 100)
+        assert DAL.verify_backup(str(dest), compressed=True) != 'ok'
+        assert sorted(p.name for p in tmp_path.iterdir()) == ['broken.db.gz']
+    
+    def test_verify_backup_detects_corruption(self, tmp_path):
+        """Test that a damaged file fails verification"""
+        dest = tmp_path / 'broken.db'
+        dest.write_bytes(b'not a database' * 100)
+        assert DAL.verify_backup(str(dest)) != 'ok'
+
+
 class TestDALErrorHandling:
     """Test suite for DAL error handling"""
     
@@ -253,3 +756,15 @@ class TestDALErrorHandling:
         """Test executing invalid SQL"""
         with pytest.raises(sqlite3.OperationalError):
             test_dal.execute_query("INVALID SQL QUERY")
+    
+    def test_unknown_column_rejected(self, test_dal):
+        """Test that helper methods validate column names against the schema"""
+        with pytest.raises(ValueError, match='Unknown column'):
+            test_dal.insert('projects', {'Title': 'x', 'Bogus': 1})
+        with pytest.raises(ValueError, match='Unknown column'):
+            test_dal.update('projects', {'Title = 1; --': 'x'}, 'ProjectID = ?', (1,))
+    
+    def test_unknown_table_rejected(self, test_dal):
+        """Test that helper methods validate table names against the schema"""
+        with pytest.raises(ValueError, match='Unknown table'):
+            test_dal.select_all('nonexistent_table')
@@ -1,6 +1,10 @@
 """
 Integration tests for Flask website with database
 """
+import json
+import os
+import subprocess
+import sys
 import pytest
 from DAL import DAL
 
@@ -23,6 +27,30 @@ class TestProjectsIntegration:
         # Should not contain inactive project
         # Note: This depends on how the template renders the data
     
+    def test_projects_page_streams_only_active_projects(self, client, test_dal, monkeypatch):
+        """Test that the streamed projects page renders every active row"""
+        import app as app_module
+        monkeypatch.setattr(app_module, 'dal', test_dal)
+        
+        response = client.get('/projects')
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert b'Test Project 1' in response.data
+        assert b'Test Project 2' in response.data
+        assert b'Inactive Project' not in response.data
+        assert b'No projects found.' not in response.data
+        assert b'<span class="tag">Flask</span>' in response.data
+    
+    def test_projects_page_empty(self, client, test_dal, monkeypatch):
+        """Test that the empty-state message still shows when streaming"""
+        import app as app_module
+        monkeypatch.setattr(app_module, 'dal', test_dal)
+        test_dal.delete('projects', 'IsActive = ?', (1,))
+        
+        response = client.get('/projects')
+        assert response.status_code == 200
+        assert b'No projects found.' in response.data
+    
     def test_add_project_persists_to_database(self, client, test_dal, monkeypatch):
         """Test that adding a project saves it to the database"""
         # Monkey patch the DAL
@@ -58,6 +86,307 @@ class TestProjectsIntegration:
         assert project[0]['TechnologiesUsed'] == 'Python'
 
 
+class TestProjectsAPI:
+    """Integration tests for the read-only projects JSON API"""
+    
+    @pytest.fixture(autouse=True)
+    def use_test_dal(self, app, test_dal, monkeypatch):
+        import app as app_module
+        monkeypatch.setattr(app_module, 'dal', test_dal)
+    
+    def test_list_active_projects(self, client):
+        """Test that the list endpoint returns only active projects"""
+        response = client.get('/api/projects')
+        assert response.status_code == 200
+        assert response.mimetype == 'application/json'
+        payload = response.get_json()
+        assert [p['Title'] for p in payload['data']] == ['Test Project 1', 'Test Project 2']
+        assert payload['next_cursor'] is None
+    
+    def test_sparse_fieldset(self, client):
+        """Test that ?fields= limits the returned keys"""
+        response = client.get('/api/projects?fields=Title,TechnologiesUsed')
+        assert response.get_json()['data'][0] == {'Title': 'Test Project 1', 'TechnologiesUsed': 'Python, Flask'}
+    
+    def test_unknown_field_rejected(self, client):
+        """Test that unknown fields are rejected rather than interpolated"""
+        response = client.get('/api/projects?fields=Title,1);DROP TABLE projects;--')
+        assert response.status_code == 400
+    
+    def test_cursor_pagination(self, client):
+        """Test walking the list one page at a time"""
+        first = client.get('/api/projects?limit=1&fields=Title').get_json()
+        assert first['data'] == [{'Title': 'Test Project 1'}]
+        second = client.get(f"/api/projects?limit=1&fields=Title&cursor={first['next_cursor']}").get_json()
+        assert second['data'] == [{'Title': 'Test Project 2'}]
+    
+    def test_etag_not_modified(self, client):
+        """Test that a matching If-None-Match returns 304"""
+        response = client.get('/api/projects')
+        assert response.headers['Cache-Control'] == 'public, max-age=60'
+        etag = response.headers['ETag']
+        response = client.get('/api/projects', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+    
+    def test_change_feed(self, client, test_dal):
+        """Test streaming changes after a cursor as JSON lines"""
+        test_dal.enable_change_log('projects')
+        response = client.get('/api/projects/changes?fields=Title')
+        assert response.mimetype == 'application/x-ndjson'
+        lines = [json.loads(line) for line in response.data.decode().splitlines()]
+        assert [(c['op'], c['id']) for c in lines] == [('insert', 1), ('insert', 2), ('delete', 3)]
+        assert lines[0]['project'] == {'Title': 'Test Project 1'}
+        assert lines[2]['project'] is None
+        
+        client.post('/add_project', data={'title': 'Fresh', 'description': 'New', 'imagefilename': 'x.jpg'})
+        response = client.get(f"/api/projects/changes?since={lines[-1]['cursor']}")
+        lines = [json.loads(line) for line in response.data.decode().splitlines()]
+        assert len(lines) == 1
+        assert lines[0]['op'] == 'insert'
+        assert lines[0]['project']['Title'] == 'Fresh'
+    
+    def test_project_detail(self, client):
+        """Test fetching a single project by ID"""
+        response = client.get('/api/projects/2?fields=Title')
+        assert response.status_code == 200
+        assert response.get_json() == {'Title': 'Test Project 2'}
+        assert 'ETag' in response.headers
+    
+    def test_project_detail_inactive_or_missing(self, client):
+        """Test that inactive and missing projects are not found"""
+        assert client.get('/api/projects/3').status_code == 404
+        assert client.get('/api/projects/999').status_code == 404
+
+
+class TestMigrateCommand:
+    """Integration tests for setting up the change log outside of import"""
+    
+    def test_import_does_not_touch_database(self, tmp_path):
+        """Test that importing the app neither needs nor creates projects.db"""
+        repo = os.path.dirname(os.path.abspath(__file__))
+        env = dict(os.environ, PYTHONPATH=repo)
+        result = subprocess.run([sys.executable, '-c', 'import app'], cwd=tmp_path, env=env,
+                                capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        assert not (tmp_path / 'projects.db').exists()
+    
+    def test_migrate_db(self, runner, test_dal, monkeypatch):
+        """Test enabling the change log through the Flask CLI"""
+        import app as app_module
+        monkeypatch.setattr(app_module, 'dal', test_dal)
+        
+        result = runner.invoke(args=['migrate-db'])
+        assert result.exit_code == 0, result.output
+        assert 'Schema version 1; change log at version 3' in result.output
+        result = runner.invoke(args=['migrate-db'])
+        assert 'Schema version 1; change log at version 3' in result.output
+    
+    def test_readyz_reflects_migration(self, client, runner, test_dal, monkeypatch):
+        """Test that a worker is only ready once its database has been migrated"""
+        import app as app_module
+        monkeypatch.setattr(app_module, 'dal', test_dal)
+        
+        response = client.get('/readyz')
+        assert response.status_code == 503
+        payload = response.get_json()
+        assert payload['status'] == 'unmigrated'
+        assert not payload['migrated']
+        assert payload['probe']['user_version'] == 0
+        
+        assert runner.invoke(args=['migrate-db']).exit_code == 0
+        response = client.get('/readyz')
+        assert response.status_code == 200
+        payload = response.get_json()
+        assert payload['status'] == 'ready'
+        assert payload['migrated']
+        assert payload['probe']['user_version'] == payload['schema_version'] == 1
+    
+    def test_routes_without_change_log(self, client, test_dal, monkeypatch):
+        """Test that a database not yet migrated still serves feeds, uncached"""
+        import app as app_module
+        monkeypatch.setattr(app_module, 'dal', test_dal)
+        
+        response = client.get('/api/projects/changes')
+        assert response.status_code == 503
+        assert 'migrate-db' in response.get_json()['error']
+        response = client.get('/projects/feed.xml')
+        assert response.status_code == 200
+        assert b'<title>Test Project 1</title>' in response.data
+
+
+class TestBackupCommand:
+    """Integration tests for the backup-db CLI command"""
+    
+    def test_backup_db(self, runner, test_dal, monkeypatch, tmp_path):
+        """Test backing up through the Flask CLI"""
+        import app as app_module
+        monkeypatch.setattr(app_module, 'dal', test_dal)
+        dest = tmp_path / 'projects.db.gz'
+        
+        result = runner.invoke(args=['backup-db', str(dest), '--pages', '1', '--sleep', '0'])
+        assert result.exit_code == 0, result.output
+        assert 'Integrity check: ok' in result.output
+        assert 'Compressed to' in result.output
+        assert dest.exists()
+    
+    def test_backup_db_compress_flag(self, runner, test_dal, monkeypatch, tmp_path):
+        """Test that --compress works whatever the destination is called"""
+        import app as app_module
+        monkeypatch.setattr(app_module, 'dal', test_dal)
+        
+        result = runner.invoke(args=['backup-db', str(tmp_path / 'snap.db'), '--compress'])
+        assert result.exit_code == 0, result.output
+        assert 'Integrity check: ok' in result.output
+
+
+class TestArchiveCommand:
+    """Integration tests for the archive-projects CLI command"""
+    
+    def test_archive_projects(self, runner, test_dal, monkeypatch):
+        """Test archiving inactive projects and vacuuming through the Flask CLI"""
+        import app as app_module
+        monkeypatch.setattr(app_module, 'dal', test_dal)
+        
+        result = runner.invoke(args=['archive-projects'])
+        assert result.exit_code == 0, result.output
+        assert 'Archived 1 project(s)' in result.output
+        assert 'Switched the database to incremental auto-vacuum (+' in result.output
+        assert 'Reclaimed' in result.output
+        assert 'Reclaimed -' not in result.output
+        assert test_dal.execute_scalar("SELECT COUNT(*) FROM projects WHERE IsActive = 0") == 0
+    
+    def test_archive_projects_older_than(self, runner, test_dal, monkeypatch):
+        """Test that recently changed inactive projects are kept"""
+        import app as app_module
+        monkeypatch.setattr(app_module, 'dal', test_dal)
+        
+        result = runner.invoke(args=['archive-projects', '--older-than-days', '30', '--no-vacuum'])
+        assert result.exit_code == 0, result.output
+        assert 'Archived 0 project(s)' in result.output
+        assert 'Reclaimed' not in result.output
+
+
+class TestHealthEndpoints:
+    """Integration tests for liveness and readiness checks"""
+    
+    def test_healthz(self, client):
+        """Test that liveness does not depend on the database"""
+        response = client.get('/healthz')
+        assert response.status_code == 200
+        assert response.get_json() == {'status': 'ok'}
+    
+    def test_readyz(self, client, test_dal, monkeypatch):
+        """Test readiness with a working, migrated database"""
+        import app as app_module
+        monkeypatch.setattr(app_module, 'dal', test_dal)
+        app_module.migrate()
+        response = client.get('/readyz')
+        assert response.status_code == 200
+        assert response.headers['Cache-Control'] == 'no-store'
+        payload = response.get_json()
+        assert payload['status'] == 'ready'
+        assert payload['probe']['ok']
+        assert 'saturation' in payload['pool']
+    
+    def test_readyz_unavailable(self, client, monkeypatch, tmp_path):
+        """Test that a broken database path reports 503"""
+        import app as app_module
+        monkeypatch.setattr(app_module, 'dal', DAL(str(tmp_path / 'missing.db')))
+        response = client.get('/readyz')
+        assert response.status_code == 503
+        assert response.get_json()['status'] == 'unavailable'
+
+
+class TestFeeds:
+    """Integration tests for the sitemap and Atom feed"""
+    
+    @pytest.fixture(autouse=True)
+    def feed_setup(self, app, test_dal, monkeypatch, tmp_path):
+        import app as app_module
+        test_dal.enable_change_log('projects')
+        monkeypatch.setattr(app_module, 'dal', test_dal)
+        monkeypatch.setitem(app.config, 'FEED_CACHE_DIR', str(tmp_path))
+        monkeypatch.setitem(app.config, 'SITE_URL', 'https://example.com/')
+        self.cache_dir = tmp_path
+    
+    def test_feed_lists_active_projects(self, client):
+        """Test the Atom feed content"""
+        response = client.get('/projects/feed.xml')
+        assert response.status_code == 200
+        assert response.mimetype == 'application/atom+xml'
+        assert b'<title>Test Project 1</title>' in response.data
+        assert b'<category term="Flask"/>' in response.data
+        assert b'Inactive Project' not in response.data
+    
+    def test_sitemap(self, client):
+        """Test the sitemap lists the site's pages"""
+        response = client.get('/sitemap.xml')
+        assert response.status_code == 200
+        assert response.mimetype == 'application/xml'
+        assert b'<loc>https://example.com/projects</loc>' in response.data
+        assert b'<lastmod>' in response.data
+    
+    def test_host_header_ignored(self, client):
+        """Test that the client's Host header neither appears in nor multiplies cached documents"""
+        for host in ['evil.example', 'other.example', 'localhost']:
+            response = client.get('/projects/feed.xml', headers={'Host': host})
+            assert response.status_code == 200
+            assert host.encode() not in response.data
+            assert b'<id>https://example.com/projects</id>' in response.data
+        assert len(list(self.cache_dir.glob('feed-*.xml'))) == 1
+    
+    def test_newer_version_survives_stale_request(self, client, monkeypatch):
+        """Test that a request still on an old version does not delete a newer copy"""
+        import app as app_module
+        client.get('/projects/feed.xml')
+        current = app_module.dal.change_version('projects')
+        newer = list(self.cache_dir.glob('feed-*.xml'))[0]
+        older = self.cache_dir / newer.name.replace(f'feed-{current}-', f'feed-{current - 1}-')
+        monkeypatch.setattr(app_module, '_change_version', lambda: current - 1)
+        assert client.get('/projects/feed.xml').status_code == 200
+        assert newer.exists() and older.exists()
+    
+    def test_missing_cache_file_is_regenerated(self, client):
+        """Test that a cache file removed by another worker is written again"""
+        client.get('/projects/feed.xml')
+        for cached in self.cache_dir.glob('feed-*.xml'):
+            cached.unlink()
+        response = client.get('/projects/feed.xml')
+        assert response.status_code == 200
+        assert b'<title>Test Project 1</title>' in response.data
+        assert len(list(self.cache_dir.glob('feed-*.xml'))) == 1
+    
+    def test_cached_until_projects_change(self, client, monkeypatch):
+        """Test that documents are served from disk until the table changes"""
+        import app as app_module
+        queries = []
+        latest_projects = app_module._latest_projects
+        monkeypatch.setattr(app_module, '_latest_projects', lambda: queries.append(1) or latest_projects())
+        
+        first = client.get('/projects/feed.xml')
+        again = client.get('/projects/feed.xml')
+        assert len(queries) == 1
+        assert again.data == first.data
+        assert again.headers['ETag'] == first.headers['ETag']
+        cached = list(self.cache_dir.glob('feed-*.xml'))
+        assert len(cached) == 1
+        
+        client.post('/add_project', data={'title': 'Feed Fresh', 'description': 'New', 'imagefilename': 'x.jpg'})
+        updated = client.get('/projects/feed.xml')
+        assert len(queries) == 2
+        assert b'Feed Fresh' in updated.data
+        assert updated.headers['ETag'] != first.headers['ETag']
+        assert list(self.cache_dir.glob('feed-*.xml')) != cached
+        assert len(list(self.cache_dir.glob('feed-*.xml'))) == 1
+    
+    def test_conditional_requests(self, client):
+        """Test ETag and Last-Modified revalidation"""
+        response = client.get('/sitemap.xml')
+        assert 'Last-Modified' in response.headers
+        response = client.get('/sitemap.xml', headers={'If-None-Match': response.headers['ETag']})
+        assert response.status_code == 304
+
+
 class TestFullWorkflow:
     """Test complete user workflows"""
     
@@ -0,0 +1,68 @@
+"""
+Tests for the Project row model
+"""
+import json
+import sqlite3
+
+from models import Project
+
+
+class TestProjectRowFactory:
+    """Test suite for building projects from cursors"""
+    
+    def test_from_row(self, test_dal):
+        """Test that the DAL can return Project objects directly"""
+        projects = test_dal.execute_query("SELECT * FROM projects ORDER BY ProjectID",
+                                          row_factory=Project.from_row)
+        assert all(isinstance(project, Project) for project in projects)
+        first = projects[0]
+        assert first.id == first.ProjectID == 1
+        assert first.Title == 'Test Project 1'
+        assert first.IsActive == 1
+        assert first.DateUpdated is None  # not in the test schema
+    
+    def test_partial_and_unknown_columns(self, test_dal):
+        """Test that unselected fields are None and extra columns are ignored"""
+        rows = list(test_dal.iter_query("SELECT Title, 42 AS Extra FROM projects ORDER BY ProjectID",
+                                        row_factory=Project.from_row))
+        assert rows[0].Title == 'Test Project 1'
+        assert rows[0].Description is None
+        assert not hasattr(rows[0], 'Extra')
+    
+    def test_layout_follows_cursor(self):
+        """Test that a new column order is picked up for each statement"""
+        conn = sqlite3.connect(':memory:')
+        conn.row_factory = Project.from_row
+        first = conn.execute("SELECT 'a' AS Title, 'b' AS Description").fetchone()
+        second = conn.execute("SELECT 'b' AS Description, 'a' AS Title").fetchone()
+        assert (first.Title, first.Description) == (second.Title, second.Description) == ('a', 'b')
+        conn.close()
+    
+    def test_slots(self):
+        """Test that projects carry no per-instance dict"""
+        project = Project(Title='Slotted')
+        assert not hasattr(project, '__dict__')
+
+
+class TestProjectFields:
+    """Test suite for derived fields and serialization"""
+    
+    def test_tags_parsed_once(self):
+        """Test that tags are split, stripped and cached"""
+        project = Project(TechnologiesUsed='Python, Flask ,, SQLite ')
+        assert project.tags == ('Python', 'Flask', 'SQLite')
+        assert project.tags is project.tags
+    
+    def test_no_tags(self):
+        """Test projects without technologies"""
+        assert Project(TechnologiesUsed=None).tags == ()
+        assert Project(TechnologiesUsed='').tags == ()
+    
+    def test_to_json(self):
+        """Test that projects serialize to JSON with their tags"""
+        project = Project(id=7, Title='JSON', TechnologiesUsed='Python', IsActive=1)
+        data = json.loads(project.to_json())
+        assert data['id'] == 7
+        assert data['Title'] == 'JSON'
+        assert data['tags'] == ['Python']
+        assert data == project.as_dict()